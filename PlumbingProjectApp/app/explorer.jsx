@@ -4,6 +4,9 @@ import { View, Text, TextInput, Pressable, ScrollView, Alert } from "react-nativ
 import { getAuth } from "firebase/auth";
 import { useLocalSearchParams } from "expo-router";
 
+// what the grid and the expanded review show; the rest of a review stays on the server
+const EXPLORER_FIELDS = "book_title,author,review,rating,date_received,first_name,last_name,anonymous,genres,grade,school,call_number";
+
 export default function AllReviews() {
   const [search, setSearch] = useState("");
   const [filter, setFilter] = useState("All");
@@ -142,40 +145,37 @@ export default function AllReviews() {
   };
   
 
-  const fetchReviews = async () => {
-    setLoading(true);
-    setError(null);
+  // every approved review, one page at a time; a single response is capped
+  const fetchApprovedReviews = async () => {
+    const all = [];
+    let cursor = null;
 
-    try {
-      const auth = getAuth();
-      const user = auth.currentUser;
-
-      let res;
-
-      if (user) {
-        const idToken = await user.getIdToken(true);
-
-        res = await fetch(
-          "https://bibliomaniacs.onrender.com/get_recommended_reviews",
-          {
-            method: "POST",
-            headers: {
-              "Content-Type": "application/json"
-            },
-            body: JSON.stringify({ idToken })
-          }
-        );
-      } else {
-        res = await fetch(
-          "https://bibliomaniacs.onrender.com/get_reviews?status=approved"
-        );
-      }
+    do {
+      const params = new URLSearchParams();
+      params.append("status", "approved");
+      params.append("page_size", "200");
+      params.append("fields", EXPLORER_FIELDS);
+      if (cursor) params.append("cursor", cursor);
 
+      const res = await fetch(`https://bibliomaniacs.onrender.com/get_reviews?${params}`);
       if (!res.ok) {
         throw new Error("Failed to fetch reviews");
       }
 
-      const data = await res.json();
+      const page = await res.json();
+      all.push(...page.reviews);
+      cursor = page.next_cursor;
+    } while (cursor);
+
+    return all;
+  };
+
+  const fetchReviews = async () => {
+    setLoading(true);
+    setError(null);
+
+    try {
+      const data = await fetchApprovedReviews();
 
       setReviews(data);
 
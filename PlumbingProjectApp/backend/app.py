@@ -1,14 +1,13 @@
 from flask import Flask, request, jsonify, send_file
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import auth, firestore
 from flask_cors import CORS
 import asyncio
 from datetime import datetime, timedelta
 import hashlib
 from modelsetup import chat
-from cache import get_cache, set_cache, make_prompt_key, delete_cache_prefix
+from cache import get_cache, set_cache, make_prompt_key, get_generation, bump_generation, incr_counter, decr_counter
 from config import ADMIN_EMAILS
-from fireo import connection
+from firestore_utils import REVIEW_COUNTERS, REVIEW_SORT_FIELDS, init_firebase
 from fireo.models import Model
 from fireo.fields import TextField, IDField, NumberField, ListField
 from review_model import Review, create_review, process_review, calculate_user_hours
@@ -34,32 +33,27 @@ import logging
 # from recommendationModel.parsing import make_book_id, normalize_text
 # from recommendationModel.genreCategorization import fetch_wikipedia_genres
 from genre_images import get_genre_image
+import books_agg
+from recommendationModel.genre_store import FALLBACK_GENRES, get_genre_resolver
 import pickle
 import base64
 # from data_loader import get_books, get_recommender_instance
 
 app = Flask(__name__)
-CORS(app)
+# the unpaginated /get_reviews list reports truncation in these headers
+CORS(app, expose_headers=["X-Next-Cursor", "X-Truncated"])
 
-service_key_json = os.environ.get("FIREBASE_SERVICE_KEY")
-
-if service_key_json:
-    with open("serviceKey.json", "w") as f:
-        f.write(service_key_json)
-
-cred = credentials.Certificate("serviceKey.json")
-firebase_admin.initialize_app(cred)
-
-connection(from_file="serviceKey.json")
-db = firestore.client()
+db = init_firebase(fireo=True)
 
 profanity.load_censor_words()
 
-genre_cache = {}
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+SPACE_PATTERN = re.compile(r"\s+")
+
 def normalize_text(text: str) -> str:
     text = text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    text = NON_WORD_PATTERN.sub(" ", text)
+    text = SPACE_PATTERN.sub(" ", text)
     return text.strip()
 
 def make_book_id(title, author):
@@ -78,11 +72,11 @@ REJECTION_REASON_TEMPLATES = {
 
 def firestore_reviews_to_model_format(firestore_reviews, books):
     from recommendationModel.parsing import make_book_id, normalize_text
-    from recommendationModel.sentiment import ReviewSentimentAnalyzer
-
-    analyzer = ReviewSentimentAnalyzer()
+    from recommendationModel.sentiment import get_analyzer
 
     seen = set()
+    added = []
+    raw_texts = []
 
     for r in firestore_reviews:
         if not r.approved:
@@ -98,7 +92,7 @@ def firestore_reviews_to_model_format(firestore_reviews, books):
 
         if book_id not in books:
 
-            genres = fetch_wikipedia_genres(title, author)
+            genres = get_cached_genres(title, author)
 
             books[book_id] = {
                 "title": title,
@@ -133,14 +127,19 @@ def firestore_reviews_to_model_format(firestore_reviews, books):
             continue
         seen.add(key)
 
-        sentiment = analyzer.score(r.review) if r.review else 0.5
-
-        books[book_id]["reviews"].append({
+        review = {
             "stars": int(r.rating) if r.rating else None,
             "text": normalize_text(r.review or ""),
             "recommended_grades": clean_grades,
-            "sentiment": sentiment
-        })
+            "sentiment": None
+        }
+        books[book_id]["reviews"].append(review)
+
+        added.append(review)
+        raw_texts.append(r.review or "")
+
+    for review, sentiment in zip(added, get_analyzer().score_batch(raw_texts)):
+        review["sentiment"] = sentiment
 
     return books
 def firestore_ratings_to_book_data(ratings_docs, books):
@@ -167,7 +166,7 @@ def firestore_ratings_to_book_data(ratings_docs, books):
 
         if book_id not in books:
 
-            genres = fetch_wikipedia_genres(title, author)
+            genres = get_cached_genres(title, author)
 
             books[book_id] = {
                 "title": title,
@@ -183,8 +182,8 @@ def firestore_ratings_to_book_data(ratings_docs, books):
             continue
 
         if not books[book_id]["genres"]:
-            books[book_id]["genres"] = fetch_wikipedia_genres(
-                books[book_id]["title"]
+            books[book_id]["genres"] = get_cached_genres(
+                books[book_id]["title"], author
             )
 
         # basically create synthetic review
@@ -557,21 +556,56 @@ def reviews_cache_key(args: dict):
         "sort_by": args.get("sort_by", "date_received"),
         "sort_order": args.get("sort_order", "desc"),
         "email_sent": args.get("email_sent"),
+        "page_size": args.get("page_size"),
+        "cursor": args.get("cursor"),
+        "fields": args.get("fields"),
     }
-    return "reviews:" + hashlib.md5(
+    return f"get_reviews:{get_generation('reviews')}:" + hashlib.md5(
         repr(sorted(key_parts.items())).encode()
     ).hexdigest()
 
 def user_reviews_cache_key(email: str):
-    return f"user_reviews:{email}"
+    return f"user_reviews:{get_generation('reviews')}:{email}"
 
-def invalidate_review_caches(user_email: str | None = None):
-    delete_cache_prefix("reviews:")
+def invalidate_review_caches():
+    # review list keys embed reviews:gen, so one INCR retires all of them;
+    # the old entries just expire
+    bump_generation("reviews")
     set_cache("all_reviews", None, ttl=1)
     set_cache("review_stats", None, ttl=1)
 
-    if user_email:
-        set_cache(f"user_reviews:{user_email}", None, ttl=1)
+# per-reviewer and per-book review counts (REVIEW_COUNTERS), so
+# /get_review_stats can count distinct reviewers and books with count()
+# instead of reading every review
+def track_review_counts(review: dict, delta: int, batch=None):
+    # pass a batch to commit the counters with the review write itself
+    writer = batch or db.batch()
+
+    for field, collection in REVIEW_COUNTERS.items():
+        value = review.get(field)
+        if not value:
+            continue
+
+        doc_id = hashlib.md5(value.encode()).hexdigest()
+        writer.set(
+            db.collection(collection).document(doc_id),
+            {field: value, "count": firestore.Increment(delta)},
+            merge=True
+        )
+
+    if batch is None:
+        writer.commit()
+
+def update_book_aggregate(review_id, review: dict, was_approved: bool, is_approved: bool):
+    # keeps books_agg in step with newly created reviews (update_review goes
+    # through books_agg.update_review); /get_recommendations and
+    # /get_recommended_reviews read only those documents
+    if was_approved == is_approved:
+        return
+
+    book_id = make_book_id(review.get("book_title") or "", review.get("author") or "")
+    books_agg.apply_review(db, book_id, review_id, review, 1 if is_approved else -1)
+    bump_generation("books_agg")
 
 @app.route("/get_user_role", methods=["POST"])
 def get_user_role_route():
@@ -760,11 +794,7 @@ def get_book_of_week():
                 genres = [book_info["genre"]]
 
         if not genres:
-            try:
-                genres = fetch_wikipedia_genres(title, author)
-            except Exception as e:
-                print(f"[Genre fallback failed] {e}")
-                genres = ["literary-fiction"]
+            genres = get_cached_genres(title, author)
 
         return jsonify({
             "title": data.get("title", "No book selected"),
@@ -1094,26 +1124,43 @@ def ask_question():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+DAILY_REVIEW_LIMIT = 2
+
 def get_daily_review_count(email):
     """Count how many reviews a user has submitted today"""
     try:
         # Get start of today (midnight) in local timezone
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Query reviews from today
-        reviews = Review.collection.filter('email', '==', email).fetch()
-        
-        # Count reviews submitted today
-        count = 0
-        for review in reviews:
-            if review.date_received and review.date_received >= today_start:
-                count += 1
-        
-        return count
+        # indexed (email, date_received) count; doesn't read the reviews
+        query = (
+            db.collection("reviews")
+            .where("email", "==", email)
+            .where("date_received", ">=", today_start)
+        )
+        return query.count(alias="n").get()[0][0].value or 0
     except Exception as e:
         print(f"Error counting daily reviews")
         return 0
 
+def daily_review_key(email):
+    return f"daily_reviews:{datetime.now().date().isoformat()}:{email}"
+
+def reserve_daily_review(email):
+    """Today's review count including this one, counted in Redis"""
+    try:
+        # a missing key (new day, or Redis lost it) starts from Firestore's count
+        return incr_counter(daily_review_key(email), ttl=2 * 86400, seed=lambda: get_daily_review_count(email))
+    except Exception as e:
+        print(f"Daily review counter unavailable: {e}")
+        return get_daily_review_count(email) + 1
+
+def release_daily_review(email):
+    try:
+        decr_counter(daily_review_key(email))
+    except Exception as e:
+        print(f"Daily review counter unavailable: {e}")
+
 @app.route("/submit_review", methods=["POST"])
 def submit_review():
     data = request.json
@@ -1134,9 +1181,10 @@ def submit_review():
     
     # Check daily review limit
     user_email = data.get("email")
-    daily_count = get_daily_review_count(user_email)
+    daily_count = reserve_daily_review(user_email)
     
-    if daily_count >= 2:
+    if daily_count > DAILY_REVIEW_LIMIT:
+        release_daily_review(user_email)
         return jsonify({
             "error": "Daily limit reached",
             "message": "You can only submit 2 reviews per day. Please try again tomorrow."
@@ -1148,12 +1196,19 @@ def submit_review():
 
     entry_id = f"{int(datetime.now().timestamp())}_{hashlib.md5(data['email'].encode()).hexdigest()[:8]}"
     data['entry_id'] = entry_id
+    data['book_id'] = make_book_id(data['book_title'], data['author'])
     
     try:
         review = create_review(data)
-        invalidate_review_caches(user_email=review.email)
+    except Exception as e:
+        release_daily_review(user_email)
+        return jsonify({"error": str(e)}), 500
+
+    try:
+        track_review_counts(data, 1)
+        invalidate_review_caches()
         
-        remaining = 12 - (daily_count + 1)
+        remaining = 12 - daily_count
         review_text = data.get("review", "")
         if profanity.contains_profanity(review_text):
             return jsonify({"error": "Review contains inappropriate language."}), 400
@@ -1162,7 +1217,7 @@ def submit_review():
             "message": "Review submitted successfully",
             "id": review.id,
             "entry_id": entry_id,
-            "daily_reviews_submitted": daily_count + 1,
+            "daily_reviews_submitted": daily_count,
             "daily_reviews_remaining": remaining
         }), 201
     except Exception as e:
@@ -1212,12 +1267,13 @@ def bulk_import_reviews():
                 email_hash = hashlib.md5(review_data.get('email', 'unknown').encode()).hexdigest()[:8]
                 review_data['entry_id'] = f"{int(review_data['date_received'].timestamp())}_{email_hash}"
             
-            review_data.setdefault('approved', True)
-            review_data.setdefault('added_to_reviewed_book_list', False)
-            review_data.setdefault('on_volgistics', False)
-            review_data.setdefault('label_created', False)
-            review_data.setdefault('label_applied', False)
-            review_data.setdefault('sent_confirmation_email', False)
+            review_data['book_id'] = make_book_id(review_data.get('book_title') or '', review_data.get('author') or '')
+            # an explicit null would be dropped by fireo like a missing field
+            for field, default in (('approved', True), ('added_to_reviewed_book_list', False),
+                                   ('on_volgistics', False), ('label_created', False),
+                                   ('label_applied', False), ('sent_confirmation_email', False)):
+                if review_data.get(field) is None:
+                    review_data[field] = default
             
             review = Review()
             for key, value in review_data.items():
@@ -1225,6 +1281,15 @@ def bulk_import_reviews():
                     setattr(review, key, value)
             
             saved_review = review.save()
+
+            # fireo leaves out None fields, and /get_reviews' order_by skips
+            # documents without the sort field; store them as null instead
+            missing_sort_fields = {f: None for f in REVIEW_SORT_FIELDS if review_data.get(f) is None}
+            if missing_sort_fields:
+                db.collection("reviews").document(saved_review.id).update(missing_sort_fields)
+
+            track_review_counts(review_data, 1)
+            update_book_aggregate(saved_review.id, review_data, False, bool(review_data.get('approved')))
             
             if review_data.get('email') and review_data.get('approved'):
                 calculate_user_hours(review_data['email'])
@@ -1252,51 +1317,118 @@ def bulk_import_reviews():
         "total_attempted": len(reviews_data)
     }), 201 if not failed_imports else 207
 
-genre_cache = {}
-
-def safe_genres(title, author):
+def get_cached_genres(title, author):
+    # persistent store lookup; a miss is fetched in the background and the
+    # fallback genre is returned meanwhile, so requests never wait on Wikipedia
     try:
-        genres = fetch_wikipedia_genres(title, author)
-
-        if not genres:
-            return None
-
-        return genres
+        return get_genre_resolver().get(title, author)
 
     except Exception as e:
-        print(f"[Genre Fetch Error] {title}: {e}")
-        return None
-
+        print(f"[Genre Lookup Error] {title}: {e}")
+        return ["literary-fiction"]
+
+
+REVIEW_FIELDS = [
+    "entry_id", "date_received", "date_processed", "first_name", "last_name",
+    "grade", "school", "email", "phone_number", "book_title", "author",
+    "recommended_audience_grade", "rating", "review", "anonymous", "approved",
+    "added_to_reviewed_book_list", "on_volgistics", "call_number", "qr_code",
+    "label_created", "label_applied", "sent_confirmation_email", "form_url",
+    "notes_to_admin", "comment_to_user", "genres",
+]
+SEARCH_FIELDS = ["book_title", "author", "first_name", "last_name"]
+
+# unpaginated callers get the old single response of up to 500 reviews
+DEFAULT_REVIEWS_LIMIT = 500
+MAX_PAGE_SIZE = 200
+# filters Firestore can't apply (search, rejected/pending) are checked here;
+# stop after this many documents and hand back a cursor instead
+MAX_REVIEWS_SCANNED = 2000
+
+def review_to_dict(doc_id, data, fields):
+    result = {"id": doc_id}
+
+    for field in fields:
+        value = data.get(field)
+
+        if field in ("date_received", "date_processed"):
+            value = value.isoformat() if value else None
+        elif field == "recommended_audience_grade":
+            value = value or []
+        elif field == "genres":
+            # enrich_review_genres.py only stores genres Wikipedia has
+            value = value or FALLBACK_GENRES
+
+        result[field] = value
+
+    return result
+
+def review_matches(data, status, search):
+    if status == "pending" and data.get("date_processed"):
+        return False
+    if status == "rejected" and not data.get("date_processed"):
+        return False
+
+    if search:
+        search_lower = search.lower()
+        name = f"{data.get('first_name') or ''} {data.get('last_name') or ''}"
+        if not (search_lower in (data.get("book_title") or "").lower() or
+                search_lower in (data.get("author") or "").lower() or
+                search_lower in name.lower()):
+            return False
+
+    return True
+
+def fetch_review_page(query, page_size, matches, cursor=None):
+    # (matching snapshots, cursor for the next page or None, whether the
+    # scan stopped at MAX_REVIEWS_SCANNED before filling the page)
+    results = []
+    last = None
+    scanned = 0
+    batch_size = max(page_size, 50)
 
-def get_cached_genres(title, author):
-    key = (
-        (title or "").strip().lower(),
-        (author or "").strip().lower()
-    )
+    if cursor:
+        last = db.collection("reviews").document(cursor).get()
+        if not last.exists:
+            raise ValueError("Invalid cursor")
 
-    # Return only VALID cached data
-    cached = genre_cache.get(key)
+    while True:
+        page_query = query.limit(batch_size)
+        if last is not None:
+            page_query = page_query.start_after(last)
 
-    if cached:
-        return cached
+        docs = list(page_query.stream())
 
-    genres = safe_genres(title, author)
+        for doc in docs:
+            last = doc
+            scanned += 1
 
-    # ONLY cache successful fetches
-    if genres and len(genres) > 0:
-        genre_cache[key] = genres
-        return genres
+            if matches(doc.to_dict()):
+                results.append(doc)
+                if len(results) == page_size:
+                    return results, doc.id, False
 
-    # fallback genre
-    return ["literary-fiction"]
+        if len(docs) < batch_size:
+            return results, None, False
 
+        if scanned >= MAX_REVIEWS_SCANNED:
+            return results, last.id, True
 
 @app.route("/get_reviews", methods=["GET"])
 def get_reviews():
+    """
+    Reviews filtered and sorted by Firestore. Pass page_size (and then the
+    returned next_cursor as cursor) to page through them; fields= limits
+    the fields returned, e.g. fields=book_title,author,rating.
+
+    Filters Firestore can't apply stop after MAX_REVIEWS_SCANNED documents:
+    paginated responses then have truncated=true, the plain list gets
+    X-Truncated / X-Next-Cursor headers.
+    """
     cache_key = reviews_cache_key(request.args)
     cached = get_cache(cache_key)
-    # if cached:
-    #     return jsonify(cached), 200
+    if cached is not None:
+        return reviews_response(cached)
     
     status = request.args.get("status")
     grade = request.args.get("grade", type=int)
@@ -1305,95 +1437,79 @@ def get_reviews():
     sort_by = request.args.get("sort_by", "date_received")
     sort_order = request.args.get("sort_order", "desc")
     email_sent_filter = request.args.get("email_sent")
-    
-    query = Review.collection
-    
-    # if status == "approved":
-    #     query = query.filter('approved', '==', True)
-    # elif status == "pending":
-    #     query = query.filter('approved', '==', False).filter('date_processed', '==', None)
-    # elif status == "rejected":
-    #     query = query.filter('approved', '==', False)
+    page_size = request.args.get("page_size", type=int)
+    cursor = request.args.get("cursor")
+    fields_arg = request.args.get("fields")
+
+    if sort_by not in REVIEW_SORT_FIELDS:
+        return jsonify({"error": f"sort_by must be one of {sorted(REVIEW_SORT_FIELDS)}"}), 400
+
+    fields = REVIEW_FIELDS
+    if fields_arg:
+        fields = [f for f in fields_arg.split(",") if f in REVIEW_FIELDS]
+
+    paginated = page_size is not None or cursor is not None
+    limit = min(max(page_size or 50, 1), MAX_PAGE_SIZE) if paginated else DEFAULT_REVIEWS_LIMIT
+
+    query = db.collection("reviews")
+
+    # null counts as False, like the old per-document `not r.approved`
+    if status == "approved":
+        query = query.where("approved", "==", True)
+    elif status in ("pending", "rejected"):
+        query = query.where("approved", "in", [False, None])
     
     if grade is not None:
-        query = query.filter('grade', '==', grade)
+        query = query.where("grade", "==", grade)
     
     if school:
-        query = query.filter('school', '==', school)
-    
-    reviews = list(query.limit(500).fetch())
-    
-    results = []
-    for r in reviews:
+        query = query.where("school", "==", school)
 
-        try:
-            genres = r.genres
-        except:
-            genres=None
-            print(r)
-            print("no")
+    if email_sent_filter == "sent":
+        query = query.where("sent_confirmation_email", "==", True)
+    elif email_sent_filter == "not_sent":
+        query = query.where("sent_confirmation_email", "in", [False, None])
 
-        if not genres:
-            genres = get_cached_genres(r.book_title, r.author)
+    direction = firestore.Query.DESCENDING if sort_order == "desc" else firestore.Query.ASCENDING
+    query = query.order_by(sort_by, direction=direction)
 
-        # Apply email sent filter
-        if email_sent_filter:
-            if email_sent_filter == "sent" and not r.sent_confirmation_email:
-                continue
-            elif email_sent_filter == "not_sent" and r.sent_confirmation_email:
-                continue
-        
-        review_dict = {
-            "id": r.id,
-            "entry_id": r.entry_id,
-            "date_received": r.date_received.isoformat() if r.date_received else None,
-            "date_processed": r.date_processed.isoformat() if r.date_processed else None,
-            "first_name": r.first_name,
-            "last_name": r.last_name,
-            "grade": r.grade,
-            "school": r.school,
-            "email": r.email,
-            "phone_number": r.phone_number,
-            "book_title": r.book_title,
-            "author": r.author,
-            "recommended_audience_grade": r.recommended_audience_grade or [],
-            "rating": r.rating,
-            "review": r.review,
-            "anonymous": r.anonymous,
-            "approved": r.approved,
-            "added_to_reviewed_book_list": r.added_to_reviewed_book_list,
-            "on_volgistics": r.on_volgistics,
-            "call_number": r.call_number,
-            "qr_code": r.qr_code,
-            "label_created": r.label_created,
-            "label_applied": r.label_applied,
-            "sent_confirmation_email": r.sent_confirmation_email,
-            "form_url": r.form_url,
-            "notes_to_admin": r.notes_to_admin,
-            "comment_to_user": r.comment_to_user,
-            "genres": genres,
-        }
-        
-        if search:
-            search_lower = search.lower()
-            if (search_lower in r.book_title.lower() or 
-                search_lower in r.author.lower() or
-                search_lower in f"{r.first_name} {r.last_name}".lower()):
-                results.append(review_dict)
-        else:
-            results.append(review_dict)
-    
-    reverse = sort_order == "desc"
-    if sort_by == "date_received":
-        results.sort(key=lambda x: x.get("date_received") or "", reverse=reverse)
-    elif sort_by == "rating":
-        results.sort(key=lambda x: x.get("rating") or 0, reverse=reverse)
-    elif sort_by == "book_title":
-        results.sort(key=lambda x: x.get("book_title") or "", reverse=reverse)
+    # only transfer what is returned, plus what review_matches reads
+    needed = set(fields)
+    if search:
+        needed.update(SEARCH_FIELDS)
+    if status in ("pending", "rejected"):
+        needed.add("date_processed")
+    query = query.select(sorted(needed))
+
+    try:
+        docs, next_cursor, truncated = fetch_review_page(
+            query, limit, lambda data: review_matches(data, status, search), cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    reviews = [review_to_dict(doc.id, doc.to_dict(), fields) for doc in docs]
+
+    if paginated:
+        results = {"reviews": reviews, "next_cursor": next_cursor, "truncated": truncated}
+    else:
+        results = {"body": reviews, "next_cursor": next_cursor, "truncated": truncated}
     
     set_cache(cache_key, results, ttl=300)
     
-    return jsonify(results), 200
+    return reviews_response(results)
+
+def reviews_response(results):
+    # the unpaginated response stays a bare list; its cursor goes in headers
+    if "body" not in results:
+        return jsonify(results), 200
+
+    response = jsonify(results["body"])
+    if results["next_cursor"]:
+        response.headers["X-Next-Cursor"] = results["next_cursor"]
+    if results["truncated"]:
+        response.headers["X-Truncated"] = "true"
+    return response, 200
 
 @app.route("/update_user_review/<review_id>", methods=["PUT"])
 def update_user_review(review_id):
@@ -1443,9 +1559,24 @@ def update_user_review(review_id):
             if field in data:
                 updates[field] = data[field]
 
-        review_ref.update(updates)
+        # a different book needs its genres looked up again
+        if any(updates.get(f, review.get(f)) != review.get(f) for f in ("book_title", "author")):
+            updates["genres"] = []
+            updates["book_id"] = make_book_id(
+                updates.get("book_title", review.get("book_title")) or "",
+                updates.get("author", review.get("author")) or "",
+            )
+
+        batch = db.batch()
+        batch.update(review_ref, updates)
+
+        if updates.get("book_title", review.get("book_title")) != review.get("book_title"):
+            track_review_counts({"book_title": review.get("book_title")}, -1, batch)
+            track_review_counts({"book_title": updates["book_title"]}, 1, batch)
+
+        batch.commit()
 
-        invalidate_review_caches(user_email=email)
+        invalidate_review_caches()
 
         return jsonify({"message": "Review updated"}), 200
 
@@ -1532,8 +1663,10 @@ def update_review(review_id):
             rejection_reason_key=updates.get("rejection_reason_key")
         )
 
-        review_ref.update(updates)
-        invalidate_review_caches(user_email=review.get("email"))
+        # the approved flag is re-read in the transaction; `review` may be stale
+        if books_agg.update_review(db, review_ref, updates, make_book_id):
+            bump_generation("books_agg")
+        invalidate_review_caches()
 
         return jsonify({
             "message": "Review updated successfully",
@@ -1652,7 +1785,7 @@ def mark_email_sent(review_id):
             "sent_confirmation_email": True
         })
 
-        invalidate_review_caches(user_email=review.get("email"))
+        invalidate_review_caches()
 
         return jsonify({"message": "Email marked as sent"}), 200
 
@@ -1688,8 +1821,18 @@ def delete_user_review(review_id):
         if review.get("approved") or review.get("date_processed"):
             return jsonify({"error": "Only pending reviews can be deleted"}), 400
 
-        review_ref.delete()
-        invalidate_review_caches(user_email=review.get("email"))
+        batch = db.batch()
+        batch.delete(review_ref)
+        track_review_counts(review, -1, batch)
+        batch.commit()
+
+        # a review submitted today gives back its slot in the daily limit
+        date_received = review.get("date_received")
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if date_received and date_received.replace(tzinfo=None) >= today_start:
+            release_daily_review(email)
+
+        invalidate_review_caches()
 
         return jsonify({"message": "Review deleted successfully"}), 200
 
@@ -1711,8 +1854,8 @@ def get_user_reviews():
 
     cache_key = user_reviews_cache_key(email)
     cached = get_cache(cache_key)
-    # if cached:
-    #     return jsonify(cached), 200
+    if cached is not None:
+        return jsonify(cached), 200
     
     try:
         reviews = Review.collection.filter('email', '==', email).fetch()
@@ -2025,6 +2168,9 @@ def get_uid_by_email():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def aggregate_count(query):
+    return query.count(alias="n").get()[0][0].value or 0
+
 @app.route("/get_review_stats", methods=["GET"])
 def get_review_stats():
     cache_key = "review_stats"
@@ -2033,18 +2179,37 @@ def get_review_stats():
         return jsonify(cached), 200
     
     try:
-        all_reviews = list(Review.collection.fetch())
-        
+        # Firestore aggregation queries: cost doesn't grow with documents read
+        reviews = db.collection("reviews")
+
+        totals = reviews.count(alias="total").avg("rating", alias="average_rating").get()[0]
+        totals = {r.alias: r.value for r in totals}
+
+        # `in [False, None]` keeps the old `not r.approved` meaning for nulls;
+        # a missing field can't be matched at all, so approved and
+        # sent_confirmation_email must be set on every review (new ones get
+        # them from Review's defaults, older ones from backfill_review_fields.py)
+        total = totals["total"] or 0
+        not_approved = reviews.where("approved", "in", [False, None])
+        approved = aggregate_count(reviews.where("approved", "==", True))
+        rejected = aggregate_count(not_approved.where("date_processed", "!=", None))
+
         stats = {
-            "total_reviews": len(all_reviews),
-            "approved_reviews": len([r for r in all_reviews if r.approved]),
-            "pending_reviews": len([r for r in all_reviews if not r.approved and not r.date_processed]),
-            "rejected_reviews": len([r for r in all_reviews if not r.approved and r.date_processed]),
-            "total_volunteer_hours": sum(0.5 for r in all_reviews if r.approved),
-            "unique_reviewers": len(set(r.email for r in all_reviews)),
-            "books_reviewed": len(set(r.book_title for r in all_reviews)),
-            "average_rating": sum(r.rating for r in all_reviews) / len(all_reviews) if all_reviews else 0,
-            "emails_not_sent": len([r for r in all_reviews if r.date_processed and not r.sent_confirmation_email]),
+            "total_reviews": total,
+            "approved_reviews": approved,
+            "pending_reviews": aggregate_count(not_approved) - rejected,
+            "rejected_reviews": rejected,
+            "total_volunteer_hours": 0.5 * approved,
+            "unique_reviewers": aggregate_count(
+                db.collection(REVIEW_COUNTERS["email"]).where("count", ">", 0)
+            ),
+            "books_reviewed": aggregate_count(
+                db.collection(REVIEW_COUNTERS["book_title"]).where("count", ">", 0)
+            ),
+            "average_rating": totals["average_rating"] or 0,
+            "emails_not_sent": aggregate_count(
+                reviews.where("sent_confirmation_email", "in", [False, None]).where("date_processed", "!=", None)
+            ),
         }
         
         set_cache(cache_key, stats, ttl=300)
@@ -2052,6 +2217,26 @@ def get_review_stats():
         return jsonify(stats), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+def books_agg_response(name, build):
+    # books_agg:gen changes whenever an aggregate does; until then the same
+    # payload is served from Redis
+    cache_key = f"{name}:{get_generation('books_agg')}"
+    payload = get_cache(cache_key)
+    if payload is None:
+        payload = build()
+        set_cache(cache_key, payload, ttl=3600)
+    return jsonify(payload)
+
+def top_book_aggregates(limit):
+    query = (
+        db.collection(books_agg.COLLECTION)
+        .order_by("avg_rating", direction=firestore.Query.DESCENDING)
+        .order_by("rating_count", direction=firestore.Query.DESCENDING)
+        .limit(limit)
+    )
+    return [doc.to_dict() for doc in query.stream()]
+
 @app.route("/get_recommendations", methods=["POST"])
 def get_recommendations():
     try:
@@ -2061,46 +2246,21 @@ def get_recommendations():
         if not id_token or not verify_firebase_token(id_token):
             return jsonify({"error": "Unauthorized"}), 401
 
-        # Fetch all books and their ratings from Firestore
-        books_ref = db.collection("reviews")
-        books_query = books_ref.where("approved", "==", True).stream()
-        books = {}
-
-        for doc in books_query:
-            book_data = doc.to_dict()
-            book_id = make_book_id(book_data.get("book_title", ""), book_data.get("author", ""))
-            rating = book_data.get("rating")
-
-            if book_id not in books:
-                books[book_id] = {
-                    "title": book_data.get("book_title", ""),
-                    "author": book_data.get("author", ""),
-                    "genres": book_data.get("genres", []),
-                    "ratings": [],
+        def build():
+            # Sorted by average rating, then by rating count
+            return {"recommendations": [
+                {
+                    "book_id": agg["book_id"],
+                    "title": agg["title"],
+                    "author": agg["author"],
+                    "genres": agg.get("genres") or FALLBACK_GENRES,
+                    "avg_rating": round(agg["avg_rating"], 2),
+                    "rating_count": agg["rating_count"],
                 }
+                for agg in top_book_aggregates(10)
+            ]}
 
-            if rating is not None:
-                books[book_id]["ratings"].append(float(rating))
-
-        # Calculate average rating for each book
-        recommendations = []
-        for book_id, book_info in books.items():
-            ratings = book_info["ratings"]
-            avg_rating = sum(ratings) / len(ratings) if ratings else 0
-            recommendations.append({
-                "book_id": book_id,
-                "title": book_info["title"],
-                "author": book_info["author"],
-                "genres": book_info["genres"],
-                "avg_rating": round(avg_rating, 2),
-                "rating_count": len(ratings),
-            })
-
-        # Sort by average rating (descending) and then by rating count (descending)
-        recommendations.sort(key=lambda x: (x["avg_rating"], x["rating_count"]), reverse=True)
-
-        # Return top 10
-        return jsonify({"recommendations": recommendations[:10]}), 200
+        return books_agg_response("recommendations", build)
 
     except Exception as e:
         print("Error in get_recommendations:", str(e))
@@ -2108,6 +2268,11 @@ def get_recommendations():
 
 @app.route("/get_recommended_reviews", methods=["POST"])
 def get_recommended_reviews():
+    """
+    The highest-rated reviews (up to books_agg.TOP_REVIEWS each) of the 50
+    best-rated books. Not a full listing: the explorer pages through
+    /get_reviews?status=approved for that.
+    """
     try:
         data = request.json
         id_token = data.get("idToken")
@@ -2115,60 +2280,40 @@ def get_recommended_reviews():
         if not id_token or not verify_firebase_token(id_token):
             return jsonify({"error": "Unauthorized"}), 401
 
-        # Fetch all approved reviews from Firestore
-        reviews_ref = db.collection("reviews")
-        reviews_query = reviews_ref.where("approved", "==", True).limit(500).stream()
-        reviews = [doc.to_dict() for doc in reviews_query]
-
-        # Group reviews by book and calculate average rating
-        book_ratings = {}
-        for review in reviews:
-            book_id = make_book_id(review.get("book_title", ""), review.get("author", ""))
-            rating = review.get("rating")
-
-            if book_id not in book_ratings:
-                book_ratings[book_id] = {
-                    "title": review.get("book_title", ""),
-                    "author": review.get("author", ""),
-                    "ratings": [],
-                    "reviews": [],
-                }
-
-            if rating is not None:
-                book_ratings[book_id]["ratings"].append(float(rating))
-            book_ratings[book_id]["reviews"].append(review)
-
-        # Calculate average rating for each book
-        for book_id, book_info in book_ratings.items():
-            ratings = book_info["ratings"]
-            avg_rating = sum(ratings) / len(ratings) if ratings else 0
-            book_info["avg_rating"] = avg_rating
-
-        # Sort books by average rating (descending)
-        sorted_books = sorted(
-            book_ratings.items(),
-            key=lambda x: x[1]["avg_rating"],
-            reverse=True
-        )
-
-        # Flatten reviews from top-rated books
-        output = []
-        for book_id, book_info in sorted_books:
-            for review in book_info["reviews"]:
-                output.append({
-                    "id": review.get("id", ""),
-                    "book_title": review["book_title"],
-                    "author": review["author"],
-                    "review": review.get("review", ""),
-                    "rating": review.get("rating"),
-                    "date_received": review.get("date_received"),
-                    "first_name": review.get("first_name", ""),
-                    "last_name": review.get("last_name", ""),
-                    "anonymous": review.get("anonymous", False),
-                    "avg_rating": book_info["avg_rating"],
-                })
-
-        return jsonify(output), 200
+        def build():
+            books = top_book_aggregates(50)
+
+            # one batched read for the stored top reviews of the top books
+            refs = [
+                db.collection("reviews").document(r["id"])
+                for agg in books for r in agg["top_reviews"]
+            ]
+            reviews = {doc.id: doc.to_dict() for doc in db.get_all(refs) if doc.exists}
+
+            output = []
+            for agg in books:
+                for top in agg["top_reviews"]:
+                    review = reviews.get(top["id"])
+                    if not review or not review.get("approved"):
+                        continue
+
+                    date_received = review.get("date_received")
+                    output.append({
+                        "id": top["id"],
+                        "book_title": review["book_title"],
+                        "author": review["author"],
+                        "review": review.get("review", ""),
+                        "rating": review.get("rating"),
+                        "date_received": date_received.isoformat() if date_received else None,
+                        "first_name": review.get("first_name", ""),
+                        "last_name": review.get("last_name", ""),
+                        "anonymous": review.get("anonymous", False),
+                        "genres": review.get("genres") or agg.get("genres") or FALLBACK_GENRES,
+                        "avg_rating": agg["avg_rating"],
+                    })
+            return output
+
+        return books_agg_response("recommended_reviews", build)
 
     except Exception as e:
         print("Error in get_recommended_reviews:", str(e))
@@ -0,0 +1,49 @@
+"""
+Give every review document the fields the app queries on.
+
+    python3 backend/backfill_review_fields.py
+
+Firestore's order_by leaves out documents that don't have the field, so
+older or imported reviews without a rating (or date_received, book_title)
+never showed up when sorting by it. Missing ratings and titles are stored
+as null, which still sorts; a missing date_received gets the document's
+creation time. Reviews without a book_id (the normalized key books_agg
+uses) get one from their title and author, and approved /
+sent_confirmation_email are set to False where they are missing, which
+/get_review_stats and the admin filters rely on.
+"""
+
+from firestore_utils import REVIEW_FLAG_DEFAULTS, REVIEW_SORT_FIELDS, commit_in_batches, init_firebase
+
+db = init_firebase()
+
+from cache import bump_generation
+from recommendationModel.parsing import make_book_id
+
+def backfill():
+    updates = []
+
+    fields = sorted(REVIEW_SORT_FIELDS | set(REVIEW_FLAG_DEFAULTS) | {"author", "book_id"})
+
+    for doc in db.collection("reviews").select(fields).stream():
+        data = doc.to_dict()
+        missing = {field: None for field in sorted(REVIEW_SORT_FIELDS) if field not in data}
+
+        if "date_received" in missing:
+            missing["date_received"] = doc.create_time
+        if not data.get("book_id"):
+            missing["book_id"] = make_book_id(data.get("book_title") or "", data.get("author") or "")
+        for field, default in REVIEW_FLAG_DEFAULTS.items():
+            if data.get(field) is None:
+                missing[field] = default
+        if missing:
+            updates.append((doc.reference, missing))
+
+    commit_in_batches(db, "update", updates)
+
+    if updates:
+        bump_generation("reviews")
+    print(f"Backfilled fields on {len(updates)} reviews")
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,156 @@
+"""
+Per-book aggregates of approved reviews, in the `books_agg` collection.
+
+One document per make_book_id: title, author, genres, rating_sum,
+rating_count, avg_rating and the ids of its highest-rated reviews. The app
+applies each approval / un-approval with update_review, which writes the
+review and its aggregate in one transaction, so /get_recommendations and
+/get_recommended_reviews read a few small documents instead of every
+approved review. Genres that enrich_review_genres.py finds later are
+filled in with fill_genres.
+
+Rebuild everything from the reviews collection (first deploy, or drift):
+
+    python3 backend/books_agg.py
+"""
+
+from firebase_admin import firestore
+from firestore_utils import commit_in_batches
+
+COLLECTION = "books_agg"
+TOP_REVIEWS = 20
+
+def _empty(book_id, review):
+    return {
+        "book_id": book_id,
+        "title": review.get("book_title", ""),
+        "author": review.get("author", ""),
+        "genres": [],
+        "rating_sum": 0.0,
+        "rating_count": 0,
+        "avg_rating": 0.0,
+        "top_reviews": [],
+    }
+
+def _add(agg, review_id, review, delta):
+    rating = review.get("rating")
+
+    if rating is not None:
+        agg["rating_sum"] += delta * float(rating)
+        agg["rating_count"] += delta
+
+    top = [r for r in agg["top_reviews"] if r["id"] != review_id]
+    if delta > 0:
+        top.append({"id": review_id, "rating": float(rating) if rating is not None else 0.0})
+        top.sort(key=lambda r: r["rating"], reverse=True)
+    agg["top_reviews"] = top[:TOP_REVIEWS]
+
+    if not agg["genres"] and review.get("genres"):
+        agg["genres"] = review["genres"]
+
+    agg["avg_rating"] = agg["rating_sum"] / agg["rating_count"] if agg["rating_count"] > 0 else 0.0
+
+def _refill_top(db, agg, review_id, transaction):
+    # after an un-approval the list can be short while the book still has
+    # more approved reviews; read the best ones back (minus review_id, which
+    # may not be written as unapproved yet). Reviews carry the same book_id;
+    # backfill_review_fields.py adds it to older ones
+    top = agg["top_reviews"]
+    if len(top) >= TOP_REVIEWS or agg["rating_count"] <= len(top):
+        return
+
+    query = (
+        db.collection("reviews")
+        .where("book_id", "==", agg["book_id"])
+        .where("approved", "==", True)
+        .order_by("rating", direction=firestore.Query.DESCENDING)
+        .limit(TOP_REVIEWS + 1)
+    )
+    docs = [doc for doc in query.get(transaction=transaction) if doc.id != review_id]
+    agg["top_reviews"] = [
+        {"id": doc.id, "rating": float(doc.get("rating") or 0.0)}
+        for doc in docs[:TOP_REVIEWS]
+    ]
+
+def _apply(transaction, db, book_id, review_id, review, delta):
+    # delta=1 when the review becomes approved, -1 when it stops being approved
+    ref = db.collection(COLLECTION).document(book_id)
+    snapshot = ref.get(transaction=transaction)
+    agg = snapshot.to_dict() if snapshot.exists else _empty(book_id, review)
+    _add(agg, review_id, review, delta)
+    if delta < 0:
+        _refill_top(db, agg, review_id, transaction)
+    transaction.set(ref, agg)
+
+def apply_review(db, book_id, review_id, review, delta):
+    # for reviews the caller has just created; existing reviews go through
+    # update_review so their approved flag is read in the transaction
+    if not book_id:
+        return
+
+    @firestore.transactional
+    def update(transaction):
+        _apply(transaction, db, book_id, review_id, review, delta)
+
+    update(db.transaction())
+
+def update_review(db, review_ref, updates, make_book_id):
+    """
+    Write `updates` to a review and, if that flips its approved flag, add it
+    to or remove it from its book's aggregate in the same transaction. The
+    flag is read inside the transaction, so concurrent approvals of one
+    review count it once. Returns True if the aggregate changed.
+    """
+
+    @firestore.transactional
+    def update(transaction):
+        review = review_ref.get(transaction=transaction).to_dict() or {}
+        was_approved = bool(review.get("approved"))
+        is_approved = bool(updates.get("approved", was_approved))
+        book_id = make_book_id(review.get("book_title") or "", review.get("author") or "")
+
+        changed = was_approved != is_approved and bool(book_id)
+        if changed:
+            _apply(transaction, db, book_id, review_ref.id, {**review, **updates}, 1 if is_approved else -1)
+
+        transaction.update(review_ref, updates)
+        return changed
+
+    return update(db.transaction())
+
+def fill_genres(db, genres_by_book):
+    # {book_id: genres} -> number of aggregates updated; only existing
+    # aggregates without genres are touched
+    refs = [db.collection(COLLECTION).document(book_id) for book_id in genres_by_book]
+    empty = [
+        snapshot.reference for snapshot in db.get_all(refs)
+        if snapshot.exists and not snapshot.to_dict().get("genres")
+    ]
+
+    return commit_in_batches(db, "update", [(ref, {"genres": genres_by_book[ref.id]}) for ref in empty])
+
+def rebuild(db, make_book_id):
+    aggregates = {}
+
+    for doc in db.collection("reviews").where("approved", "==", True).stream():
+        review = doc.to_dict()
+        book_id = make_book_id(review.get("book_title", ""), review.get("author", ""))
+        if not book_id:
+            continue
+
+        agg = aggregates.setdefault(book_id, _empty(book_id, review))
+        _add(agg, doc.id, review, 1)
+
+    for old in db.collection(COLLECTION).list_documents():
+        if old.id not in aggregates:
+            old.delete()
+
+    return commit_in_batches(db, "set", (
+        (db.collection(COLLECTION).document(book_id), agg) for book_id, agg in aggregates.items()
+    ))
+
+if __name__ == "__main__":
+    from firestore_utils import init_firebase
+    from recommendationModel.parsing import make_book_id
+
+    print(f"Rebuilt {rebuild(init_firebase(), make_book_id)} book aggregates")
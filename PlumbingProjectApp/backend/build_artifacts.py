@@ -0,0 +1,40 @@
+"""
+Build the recommender's model artifacts offline.
+
+    python3 backend/build_artifacts.py
+
+Parses the CSVs, pulls Firestore reviews and ratings, scores sentiment,
+backfills genres, encodes embeddings and compacts the embedding store into
+one shard, then writes a new version under ARTIFACT_DIR and points CURRENT
+at it. Running web workers pick the new version up on their next
+recommendation call.
+"""
+
+import argparse
+import os
+import time
+from firestore_utils import init_firebase
+
+init_firebase(fireo=True)
+
+from data_loader import ARTIFACT_DIR, build_model_books, get_book_embeddings
+from recommendationModel.artifacts import write_artifacts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build recommender model artifacts")
+    parser.add_argument("--out", default=ARTIFACT_DIR)
+    parser.add_argument("--keep", type=int, default=3, help="versions to keep on disk")
+    args = parser.parse_args()
+
+    start = time.time()
+
+    books = build_model_books()
+    print(f"Books: {len(books)}")
+
+    book_embeddings = get_book_embeddings(books, compact=True)
+    print(f"Books with embeddings: {len(book_embeddings)}")
+
+    os.makedirs(args.out, exist_ok=True)
+    version = write_artifacts(args.out, books, book_embeddings, keep=args.keep)
+
+    print(f"✅ Wrote artifacts {version} to {args.out} in {time.time() - start:.1f}s")
@@ -2,6 +2,7 @@ import redis
 import hashlib
 import json
 import os
+import time
 
 REDIS_URL = os.environ.get("REDIS_URL", "redis://red-d6keeht6ubrc73edn16g")
 cache = redis.Redis.from_url(REDIS_URL)
@@ -22,4 +23,35 @@ def make_prompt_key(prompt):
 
 def delete_cache_prefix(prefix):
     for key in cache.scan_iter(f"{prefix}*"):
-        cache.delete(key)
\ No newline at end of file
+        cache.delete(key)
+
+def get_generation(name):
+    # embedded in cache keys; bump_generation retires every key built on the old value
+    key = f"{name}:gen"
+    value = cache.get(key)
+    if value is None:
+        # start from the clock, not 0, so an evicted counter never
+        # comes back to a number that old keys were built with
+        cache.set(key, int(time.time() * 1000), nx=True)
+        value = cache.get(key)
+    return int(value)
+
+def bump_generation(name):
+    return cache.incr(f"{name}:gen")
+
+def incr_counter(key, ttl, seed=None):
+    # INCR with an expiry; seed() gives the starting value if the key is missing
+    if seed is not None and not cache.exists(key):
+        cache.set(key, seed(), ex=ttl, nx=True)
+
+    value = cache.incr(key)
+    if value == 1:
+        cache.expire(key, ttl)
+    return value
+
+def decr_counter(key):
+    # a missing key is seeded again by the next incr_counter; DECR would
+    # recreate it at -1 with no expiry
+    if not cache.exists(key):
+        return None
+    return cache.decr(key)
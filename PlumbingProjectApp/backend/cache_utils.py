@@ -2,6 +2,8 @@ import os
 import redis
 import pickle
 import base64
+import json
+import uuid
 
 # Use Redis if available, otherwise fall back to in-memory
 REDIS_URL = os.environ.get("REDIS_URL")
@@ -33,4 +35,38 @@ def delete_cache(key):
         try:
             redis_client.delete(key)
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+def set_chunked(key, payload, ttl=3600, chunk_size=1024 * 1024):
+    # large bytes values are split across keys; meta is written last and
+    # names a fresh generation so readers never mix chunks of two writes
+    if redis_client:
+        try:
+            gen = uuid.uuid4().hex[:12]
+            chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+
+            pipe = redis_client.pipeline(transaction=False)
+            for i, chunk in enumerate(chunks):
+                pipe.setex(f"{key}:{gen}:{i}", ttl, chunk)
+            pipe.setex(f"{key}:meta", ttl, json.dumps({"gen": gen, "chunks": len(chunks), "size": len(payload)}))
+            pipe.execute()
+        except Exception:
+            pass
+
+def get_chunked(key):
+    if redis_client:
+        try:
+            meta = redis_client.get(f"{key}:meta")
+            if not meta:
+                return None
+
+            meta = json.loads(meta)
+            chunks = redis_client.mget([f"{key}:{meta['gen']}:{i}" for i in range(meta["chunks"])])
+            if any(c is None for c in chunks):
+                return None
+
+            payload = b"".join(chunks)
+            return payload if len(payload) == meta["size"] else None
+        except Exception:
+            pass
+    return None
@@ -1,12 +1,20 @@
-from cache_utils import get_cache, set_cache
+from cache_utils import get_cache, set_cache, get_chunked, set_chunked
 from recommendationModel.parsing import load_books, load_reviews, make_book_id, normalize_text
 from recommendationModel.embeddings import EmbeddingBuilder
+from recommendationModel.embedding_store import EmbeddingStore
 from recommendationModel.model import HybridRecommender
-from recommendationModel.housedBooks.modelIncorp import AvailabilityCache, AvailabilityService, ContextAwareRecommender
-from recommendationModel.genreCategorization import fetch_wikipedia_genres
+from recommendationModel.housedBooks.modelIncorp import AvailabilityCache, AvailabilityService, AvailabilitySnapshot, ContextAwareRecommender
+from recommendationModel.genre_store import get_genre_resolver
+from recommendationModel.artifacts import current_version, load_artifacts
+from recommendationModel.snapshot import encode_snapshot, decode_snapshot
 import os
 import pickle
 import base64
+import threading
+import time
+
+EMBEDDING_STORE_DIR = os.environ.get("EMBEDDING_STORE_DIR", "./backend/recommendationModel/embedding_store")
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "./backend/recommendationModel/artifacts")
 
 # --- Lazy-loaders ---
 def get_books_data():
@@ -49,41 +57,102 @@ def get_ratings_docs():
     set_cache(cache_key, ratings_docs, ttl=300)
     return ratings_docs
 
-def get_book_embeddings(books_data):
-    cache_key = "book_embeddings"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-
+def get_book_embeddings(books_data, compact=False):
+    # vectors come from the mmapped on-disk store; only new reviews are encoded.
+    # compact: merge the store's shards afterwards (offline builds only)
     embedder = EmbeddingBuilder()
-    book_embeddings = embedder.build_book_embeddings(books_data)
-    set_cache(cache_key, book_embeddings, ttl=86400)
+    store = EmbeddingStore(EMBEDDING_STORE_DIR, model_name=embedder.model_name)
+    book_embeddings = embedder.build_book_embeddings(books_data, store=store)
+
+    if compact:
+        store.compact()
+
     return book_embeddings
 
-def get_recommender(books_data, book_embeddings):
-    cache_key = "recommender"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
+_availability_snapshot = None
 
-    cache = AvailabilityCache(redis_host="redis://red-d6keeht6ubrc73edn16g", redis_port=6379)
-    availability_service = AvailabilityService(cache)
-    recommender = HybridRecommender(book_embeddings, books_data)
-    context_recommender = ContextAwareRecommender(
+def get_availability_snapshot():
+    # one snapshot (and refresh thread) per process, shared by every model version
+    global _availability_snapshot
+    if _availability_snapshot is None:
+        cache = AvailabilityCache(redis_host="redis://red-d6keeht6ubrc73edn16g", redis_port=6379)
+        _availability_snapshot = AvailabilitySnapshot(AvailabilityService(cache)).start()
+    return _availability_snapshot
+
+def make_context_recommender(recommender, books_data):
+    return ContextAwareRecommender(
         base_recommender=recommender,
         books=books_data,
-        availability_service=availability_service,
+        availability_service=get_availability_snapshot(),
         initial_pool=50,
         expansion_step=50,
         max_pool=300
     )
-    set_cache(cache_key, (recommender, context_recommender), ttl=86400)
+
+SNAPSHOT_KEY = "recommender:snapshot"
+
+def get_cached_recommender():
+    # warm start from the compressed snapshot; the availability layer
+    # (live Redis client) is always rebuilt rather than serialized
+    start = time.perf_counter()
+    payload = get_chunked(SNAPSHOT_KEY)
+    if payload is None:
+        return None
+    fetched = time.perf_counter()
+
+    try:
+        snapshot = decode_snapshot(payload)
+        decoded = time.perf_counter()
+        recommender = HybridRecommender.from_snapshot(snapshot)
+    except Exception as e:
+        print(f"[data_loader] ignoring unreadable recommender snapshot: {e}")
+        return None
+    built = time.perf_counter()
+
+    print(
+        f"[data_loader] snapshot {len(payload) / 1e6:.1f}MB: "
+        f"fetch {1000 * (fetched - start):.0f}ms, "
+        f"decode {1000 * (decoded - fetched):.0f}ms, "
+        f"build {1000 * (built - decoded):.0f}ms"
+    )
+    return recommender, make_context_recommender(recommender, recommender.books)
+
+def get_recommender(books_data, book_embeddings):
+    recommender = HybridRecommender(book_embeddings, books_data)
+    context_recommender = make_context_recommender(recommender, books_data)
+    set_chunked(SNAPSHOT_KEY, encode_snapshot(recommender.to_snapshot()), ttl=86400)
     return recommender, context_recommender
 
+def build_model_books():
+    # full offline pipeline: CSVs + Firestore reviews/ratings + genre backfill
+    books = get_books()
+    firestore_reviews = get_firestore_reviews()
+    ratings_docs = get_ratings_docs()
+    books = firestore_reviews_to_model_format(firestore_reviews, books)
+    books = firestore_ratings_to_book_data(ratings_docs, books)
+    missing = [b for b in books.values() if not b.get("genres")]
+    if missing:
+        resolved = get_genre_resolver().resolve_many((b["title"], b.get("author")) for b in missing)
+        for book in missing:
+            book["genres"] = resolved[(book["title"], book.get("author"))]
+    return books
+
+def load_recommender_from_artifacts(version=None):
+    loaded = load_artifacts(ARTIFACT_DIR, version)
+    if loaded is None:
+        return None
+
+    version, books, book_embeddings, features, packed = loaded
+    recommender = HybridRecommender(book_embeddings, books, features=features, packed=packed)
+    print(f"[data_loader] loaded model artifacts {version}")
+    return version, recommender, make_context_recommender(recommender, books)
+
 # --- Initialize on first use ---
 _books_data = None
 _recommender = None
 _context_recommender = None
+_artifact_version = None
+_swap_lock = threading.Lock()
 
 def get_books():
     global _books_data
@@ -92,25 +161,36 @@ def get_books():
     return _books_data
 
 def get_recommender_instance():
-    global _recommender, _context_recommender
+    global _recommender, _context_recommender, _artifact_version
+
+    # prefer prebuilt artifacts (see build_artifacts.py); a new CURRENT
+    # version is picked up on the next call and swapped in whole
+    version = current_version(ARTIFACT_DIR)
+    if version is not None and version != _artifact_version:
+        with _swap_lock:
+            if version != _artifact_version:
+                loaded = load_recommender_from_artifacts(version)
+                if loaded is not None:
+                    _artifact_version, recommender, context_recommender = loaded
+                    _recommender, _context_recommender = recommender, context_recommender
+
     if _recommender is None:
-        books = get_books()
-        firestore_reviews = get_firestore_reviews()
-        ratings_docs = get_ratings_docs()
-        books = firestore_reviews_to_model_format(firestore_reviews, books)
-        books = firestore_ratings_to_book_data(ratings_docs, books)
-        for book_id, book in books.items():
-            if not book.get("genres"):
-                book["genres"] = fetch_wikipedia_genres(book["title"], book.get("author"))
+        cached = get_cached_recommender()
+        if cached is not None:
+            _recommender, _context_recommender = cached
+            return _recommender, _context_recommender
+
+        books = build_model_books()
         book_embeddings = get_book_embeddings(books)
         _recommender, _context_recommender = get_recommender(books, book_embeddings)
     return _recommender, _context_recommender
 
 def firestore_reviews_to_model_format(firestore_reviews, books):
     from recommendationModel.parsing import make_book_id, normalize_text
-    from recommendationModel.sentiment import ReviewSentimentAnalyzer
-    analyzer = ReviewSentimentAnalyzer()
+    from recommendationModel.sentiment import get_analyzer
     seen = set()
+    added = []
+    raw_texts = []
     for r in firestore_reviews:
         if not r.approved:
             continue
@@ -120,8 +200,8 @@ def firestore_reviews_to_model_format(firestore_reviews, books):
             continue
         book_id = make_book_id(title, author)
         if book_id not in books:
-            genres = fetch_wikipedia_genres(title, author)
-            books[book_id] = {"title": title, "author": author, "genres": genres, "reviews": []}
+            # genres are backfilled in one concurrent pass by build_model_books
+            books[book_id] = {"title": title, "author": author, "genres": [], "reviews": []}
         try:
             stars = int(r.rating)
         except:
@@ -143,13 +223,17 @@ def firestore_reviews_to_model_format(firestore_reviews, books):
         if key in seen:
             continue
         seen.add(key)
-        sentiment = analyzer.score(r.review) if r.review else 0.5
-        books[book_id]["reviews"].append({
+        review = {
             "stars": int(r.rating) if r.rating else None,
             "text": normalize_text(r.review or ""),
             "recommended_grades": clean_grades,
-            "sentiment": sentiment
-        })
+            "sentiment": None
+        }
+        books[book_id]["reviews"].append(review)
+        added.append(review)
+        raw_texts.append(r.review or "")
+    for review, sentiment in zip(added, get_analyzer().score_batch(raw_texts)):
+        review["sentiment"] = sentiment
     return books
 
 def firestore_ratings_to_book_data(ratings_docs, books):
@@ -163,14 +247,11 @@ def firestore_ratings_to_book_data(ratings_docs, books):
         if not book_id or rating is None:
             continue
         if book_id not in books:
-            genres = fetch_wikipedia_genres(title, author)
-            books[book_id] = {"title": title, "author": author, "genres": genres, "reviews": []}
+            books[book_id] = {"title": title, "author": author, "genres": [], "reviews": []}
         try:
             stars = int(rating)
         except:
             continue
-        if not books[book_id]["genres"]:
-            books[book_id]["genres"] = fetch_wikipedia_genres(books[book_id]["title"])
         books[book_id]["reviews"].append({
             "stars": stars,
             "text": "",
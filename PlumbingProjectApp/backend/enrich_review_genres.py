@@ -0,0 +1,80 @@
+"""
+Fill in `genres` on Firestore review documents, outside the request path.
+
+    python3 backend/enrich_review_genres.py               # once
+    python3 backend/enrich_review_genres.py --interval 600
+
+Finds reviews without genres, resolves their books through the shared
+genre store (cached, batched Wikipedia lookups) and writes the genres back
+in batched updates. Only genres Wikipedia actually has are written: books
+it has none for, or whose lookup failed, stay empty and are tried again
+on the next run. /get_reviews shows the fallback genre for those.
+Book aggregates (books_agg) without genres get them too.
+"""
+
+import argparse
+import time
+from firestore_utils import commit_in_batches, init_firebase
+
+db = init_firebase()
+
+import books_agg
+from cache import bump_generation
+from recommendationModel.genre_store import get_genre_resolver
+from recommendationModel.parsing import make_book_id
+
+def find_reviews_without_genres():
+    docs = db.collection("reviews").select(["book_title", "author", "genres"]).stream()
+
+    missing = []
+    for doc in docs:
+        data = doc.to_dict()
+        if not data.get("genres") and data.get("book_title"):
+            missing.append((doc.reference, data["book_title"], data.get("author")))
+
+    return missing
+
+def enrich_reviews():
+    missing = find_reviews_without_genres()
+    if not missing:
+        print("All reviews have genres")
+        return 0
+
+    resolved = get_genre_resolver().resolve_many(
+        ((title, author) for _, title, author in missing), fallback=False
+    )
+    found = [
+        (ref, title, author, resolved[(title, author)])
+        for ref, title, author in missing
+        if resolved.get((title, author))
+    ]
+
+    commit_in_batches(db, "update", [(ref, {"genres": genres}) for ref, _, _, genres in found])
+
+    if found:
+        # cached /get_reviews pages still have the old, genre-less documents
+        bump_generation("reviews")
+    print(f"Added genres to {len(found)} of {len(missing)} reviews")
+
+    genres_by_book = {make_book_id(title, author or ""): genres for _, title, author, genres in found}
+    if books_agg.fill_genres(db, genres_by_book):
+        bump_generation("books_agg")
+
+    return len(found)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write genres onto Firestore reviews")
+    parser.add_argument("--interval", type=float, help="keep running, checking every N seconds")
+    args = parser.parse_args()
+
+    while True:
+        try:
+            enrich_reviews()
+        except Exception as e:
+            if args.interval is None:
+                raise
+            print(f"Genre enrichment failed: {e}")
+
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
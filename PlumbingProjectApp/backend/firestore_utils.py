@@ -0,0 +1,61 @@
+"""
+Firebase setup, batched writes and review-document constants shared by
+app.py and the maintenance scripts next to it. The scripts run from the
+project root, same as the server (python3 backend/<script>.py), and call
+init_firebase() before anything touches Firestore.
+"""
+
+import os
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+SERVICE_KEY_PATH = "serviceKey.json"
+
+# review field -> collection of per-value review counts
+REVIEW_COUNTERS = {
+    "email": "review_counts_by_email",
+    "book_title": "review_counts_by_book",
+}
+
+# /get_reviews sorts on these; Firestore's order_by skips documents without
+# the field, so every review has them (null is fine)
+REVIEW_SORT_FIELDS = {"date_received", "rating", "book_title"}
+
+# flags queries filter on with `in [False, None]`; a missing field matches nothing
+REVIEW_FLAG_DEFAULTS = {"approved": False, "sent_confirmation_email": False}
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_WRITES = 500
+
+def init_firebase(fireo=False):
+    # the service key comes from FIREBASE_SERVICE_KEY on the server; returns
+    # a Firestore client, and also connects fireo's models if asked
+    service_key_json = os.environ.get("FIREBASE_SERVICE_KEY")
+
+    if service_key_json:
+        with open(SERVICE_KEY_PATH, "w") as f:
+            f.write(service_key_json)
+
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        firebase_admin.initialize_app(credentials.Certificate(SERVICE_KEY_PATH))
+
+    if fireo:
+        from fireo import connection
+        connection(from_file=SERVICE_KEY_PATH)
+
+    return firestore.client()
+
+def commit_in_batches(db, method, writes):
+    # writes: (document ref, data) pairs, applied with batch.set or
+    # batch.update (method) MAX_BATCH_WRITES at a time; returns how many
+    writes = list(writes)
+
+    for start in range(0, len(writes), MAX_BATCH_WRITES):
+        batch = db.batch()
+        for ref, data in writes[start:start + MAX_BATCH_WRITES]:
+            getattr(batch, method)(ref, data)
+        batch.commit()
+
+    return len(writes)
@@ -0,0 +1,39 @@
+"""
+Rebuild the per-reviewer and per-book review counters from scratch.
+
+    python3 backend/rebuild_review_counts.py
+
+The web app keeps these counters up to date as reviews are submitted,
+edited and deleted; this is for the first deploy, or if they drift.
+/get_review_stats counts the non-zero entries for unique_reviewers and
+books_reviewed.
+"""
+
+import hashlib
+from collections import Counter
+from firestore_utils import REVIEW_COUNTERS, commit_in_batches, init_firebase
+
+db = init_firebase()
+
+def rebuild():
+    counts = {field: Counter() for field in REVIEW_COUNTERS}
+
+    for doc in db.collection("reviews").select(list(REVIEW_COUNTERS)).stream():
+        data = doc.to_dict()
+        for field in REVIEW_COUNTERS:
+            if data.get(field):
+                counts[field][data[field]] += 1
+
+    for field, collection in REVIEW_COUNTERS.items():
+        for old in db.collection(collection).list_documents():
+            old.delete()
+
+        written = commit_in_batches(db, "set", (
+            (db.collection(collection).document(hashlib.md5(value.encode()).hexdigest()), {field: value, "count": n})
+            for value, n in counts[field].items()
+        ))
+
+        print(f"{collection}: {written} entries")
+
+if __name__ == "__main__":
+    rebuild()
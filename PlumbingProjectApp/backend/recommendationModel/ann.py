@@ -0,0 +1,140 @@
+import numpy as np
+
+# below this many review vectors an exhaustive scan is already cheap,
+# so build_index(kind="auto") returns None and every book gets scored
+EXACT_THRESHOLD = 20000
+
+
+def _top_items(sims, owners, n_items, top_m):
+    # a book's score is its best matching review
+    best = np.full(n_items, -np.inf, dtype=np.float32)
+    np.maximum.at(best, owners, sims)
+
+    hit = np.flatnonzero(np.isfinite(best))
+    if len(hit) > top_m:
+        keep = np.argpartition(-best[hit], top_m - 1)[:top_m]
+        hit = hit[keep]
+
+    return np.sort(hit)
+
+
+def _unit(query):
+    query = np.asarray(query, dtype=np.float32).ravel()
+    norm = np.linalg.norm(query)
+    return query / norm if norm else query
+
+
+class ExactIndex:
+    def __init__(self, vectors, owners, n_items):
+        self.vectors = vectors
+        self.owners = owners
+        self.n_items = n_items
+
+    def search(self, query, top_m):
+        sims = self.vectors @ _unit(query)
+        return _top_items(sims, self.owners, self.n_items, top_m)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: spherical k-means over the review vectors, then a
+    query only scans the n_probe closest lists.
+    """
+
+    def __init__(self, vectors, owners, n_items, n_lists=None, n_probe=8, iters=10, seed=0):
+        self.vectors = vectors
+        self.owners = owners
+        self.n_items = n_items
+
+        n = len(vectors)
+        n_lists = n_lists or int(np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+        self.n_probe = min(n_probe, n_lists)
+
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, n_lists, replace=False)].copy()
+
+        for _ in range(iters):
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+
+        self.centroids = centroids
+        self.order = np.argsort(assign, kind="stable")
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=self.list_offsets[1:])
+
+    def search(self, query, top_m):
+        query = _unit(query)
+
+        probe = np.argpartition(-(self.centroids @ query), self.n_probe - 1)[:self.n_probe]
+        ids = np.concatenate([
+            self.order[self.list_offsets[l]:self.list_offsets[l + 1]]
+            for l in probe
+        ])
+
+        sims = self.vectors[ids] @ query
+        return _top_items(sims, self.owners[ids], self.n_items, top_m)
+
+
+class HNSWIndex:
+    # optional: only used when hnswlib is installed
+    def __init__(self, vectors, owners, n_items, m=16, ef_construction=200, ef=128):
+        import hnswlib
+
+        self.owners = owners
+        self.n_items = n_items
+        self.ef = ef
+
+        self.index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self.index.init_index(max_elements=len(vectors), ef_construction=ef_construction, M=m)
+        self.index.add_items(vectors, np.arange(len(vectors)))
+
+    def search(self, query, top_m):
+        # books have several reviews each, so over-fetch before grouping
+        k = min(self.index.get_current_count(), top_m * 5)
+        self.index.set_ef(max(self.ef, k))
+
+        labels, distances = self.index.knn_query(_unit(query), k=k)
+        labels = labels[0].astype(np.int64)
+        sims = (1 - distances[0]).astype(np.float32)
+
+        return _top_items(sims, self.owners[labels], self.n_items, top_m)
+
+
+def _hnsw_available():
+    try:
+        import hnswlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_index(vectors, owners, n_items, kind="auto", exact_threshold=EXACT_THRESHOLD):
+    """
+    kind: "auto", "exact", "ivf" or "hnsw". Returns None when the catalog is
+    small enough that scoring every book is the better plan.
+    """
+    if not len(vectors):
+        return None
+
+    if kind == "auto":
+        if len(vectors) < exact_threshold:
+            return None
+        kind = "hnsw" if _hnsw_available() else "ivf"
+
+    if kind == "exact":
+        return ExactIndex(vectors, owners, n_items)
+    if kind == "ivf":
+        return IVFIndex(vectors, owners, n_items)
+    if kind == "hnsw":
+        return HNSWIndex(vectors, owners, n_items)
+
+    raise ValueError(f"Unknown index kind: {kind}")
@@ -0,0 +1,130 @@
+"""
+Versioned model artifacts: built offline, loaded (mmapped) by the web process.
+
+    <root>/CURRENT             name of the live version
+    <root>/<version>/
+        manifest.json          version, build time, sizes
+        books.json             book_id -> title, author, reviews
+        genres.json            book_id -> canonical genres
+        features.npz           BookFeatureStore arrays, in book order
+        vectors.npy            packed review vectors (float32)
+        offsets.npy            vectors[offsets[i]:offsets[i + 1]] -> book i
+        centroids.npy          per-book centroid, zero rows for unembedded books
+
+A new version is written to its own directory and only becomes live when
+CURRENT is atomically replaced, so readers never see a half-written build.
+"""
+
+import json
+import os
+import shutil
+import time
+import numpy as np
+from recommendationModel.features import BookFeatureStore
+from recommendationModel.scoring import pack_centroids, pack_review_vectors, unpack_review_vectors
+
+CURRENT = "CURRENT"
+FEATURE_ARRAYS = ("avg_sentiment", "avg_grade", "review_count", "variance")
+
+
+def _atomic_write(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def current_version(root):
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_artifacts(root, books, book_embeddings, keep=3):
+    version = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(root, version)
+    os.makedirs(path)
+
+    book_ids = list(books)
+    features = BookFeatureStore(book_embeddings, books)
+    vectors, offsets = pack_review_vectors(book_ids, book_embeddings)
+
+    dim = vectors.shape[1] if vectors.size else 0
+    centroids = pack_centroids(book_ids, book_embeddings, dim)
+
+    table = {
+        bid: {"title": b["title"], "author": b.get("author"), "reviews": b["reviews"]}
+        for bid, b in books.items()
+    }
+
+    with open(os.path.join(path, "books.json"), "w") as f:
+        json.dump(table, f, default=float)
+    with open(os.path.join(path, "genres.json"), "w") as f:
+        json.dump({bid: b.get("genres") or [] for bid, b in books.items()}, f)
+
+    np.savez(os.path.join(path, "features.npz"), **{k: getattr(features, k) for k in FEATURE_ARRAYS})
+    np.save(os.path.join(path, "vectors.npy"), vectors)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "centroids.npy"), centroids)
+
+    manifest = {
+        "version": version,
+        "built_at": time.time(),
+        "books": len(book_ids),
+        "embedded_books": len(book_embeddings),
+        "review_vectors": int(len(vectors)),
+        "dim": int(dim)
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    _atomic_write(os.path.join(root, CURRENT), version)
+    _prune(root, keep)
+
+    return version
+
+
+def _prune(root, keep):
+    live = current_version(root)
+    versions = sorted(
+        d for d in os.listdir(root)
+        if os.path.isdir(os.path.join(root, d)) and d != live
+    )
+    for old in versions[:max(0, len(versions) - (keep - 1))]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+def load_artifacts(root, version=None):
+    """
+    Returns (version, books, book_embeddings, features, packed). Review
+    vectors are views into the mmapped vectors.npy, not copies.
+    """
+    version = version or current_version(root)
+    if version is None:
+        return None
+
+    path = os.path.join(root, version)
+
+    with open(os.path.join(path, "books.json")) as f:
+        books = json.load(f)
+    with open(os.path.join(path, "genres.json")) as f:
+        genres = json.load(f)
+
+    for book_id, book in books.items():
+        book["genres"] = genres.get(book_id, [])
+
+    vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(path, "offsets.npy"))
+    centroids = np.load(os.path.join(path, "centroids.npy"), mmap_mode="r")
+
+    with np.load(os.path.join(path, "features.npz")) as npz:
+        arrays = {k: npz[k] for k in FEATURE_ARRAYS}
+
+    book_ids = list(books)
+    features = BookFeatureStore.from_arrays(book_ids, [genres.get(b, []) for b in book_ids], arrays)
+
+    book_embeddings = unpack_review_vectors(book_ids, vectors, offsets, centroids, arrays["variance"])
+
+    return version, books, book_embeddings, features, (vectors, offsets)
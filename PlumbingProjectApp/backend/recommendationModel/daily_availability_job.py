@@ -1,30 +1,190 @@
-from housedBooks.availability import avail
-from housedBooks.modelIncorp import AvailabilityCache
-from parsing import load_books
+"""
+Nightly library availability refresh.
 
+    cd backend
+    python -m recommendationModel.daily_availability_job --workers 4 --rate 1.0
+
+Titles are checked by a pool of workers, each with its own reusable session
+(plain HTTP by default, headless Chrome with --fetcher selenium), behind one shared token bucket so the catalog host sees at most
+--rate requests per second overall. Failed lookups are retried with
+exponential backoff. Finished titles are checkpointed so an interrupted
+run resumes where it stopped (checkpoints only apply to the same day).
+
+Which titles get checked is decided by RefreshScheduler: the stalest,
+most recommended and last-seen-available titles first, as many as fit in
+--budget-minutes. Workers stop picking up titles once the budget is spent.
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import threading
 import time
+from datetime import date
+from recommendationModel.housedBooks.availability import HttpAvailabilityChecker, LibraryAvailabilityChecker
+from recommendationModel.housedBooks.modelIncorp import AvailabilityCache
+from recommendationModel.housedBooks.refresh_scheduler import RefreshScheduler
+from recommendationModel.parsing import load_books
+from recommendationModel.ratelimit import TokenBucket
 
-cache = AvailabilityCache()
+BOOKS_CSV = os.path.join(os.path.dirname(__file__), "reviewedBooks.csv")
+CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), "cache", "availability_checkpoint.json")
 
-books = load_books("reviewedBooks.csv")
-def update_availability_for_books(book_titles):
-    for i, title in enumerate(book_titles):
-        try:
-            print(f"[{i+1}/{len(book_titles)}] Checking: {title}")
+def load_checkpoint(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+    if data.get("date") != date.today().isoformat():
+        return {}
+
+    return data.get("done", {})
+
+def save_checkpoint(path, done):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"date": date.today().isoformat(), "done": done}, f)
+    os.replace(tmp, path)
 
-            is_available = avail(title)
-            cache.set(title, is_available)
+def update_availability_parallel(
+    book_titles,
+    cache,
+    workers=4,
+    rate=1.0,
+    retries=3,
+    backoff=2.0,
+    checkpoint_path=CHECKPOINT_PATH,
+    checker_factory=LibraryAvailabilityChecker,
+    deadline=None
+):
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    todo = [t for t in book_titles if t not in done]
 
-            time.sleep(2)
+    print(f"{len(done)} titles already checked today, {len(todo)} to go")
 
+    titles = queue.Queue()
+    for title in todo:
+        titles.put(title)
+
+    bucket = TokenBucket(rate, capacity=workers)
+    lock = threading.Lock()
+    failed = []
+    checked = [0]
+
+    def record(title, available):
+        with lock:
+            done[title] = available
+            checked[0] += 1
+            print(f"[{checked[0]}/{len(todo)}] {title}: {'available' if available else 'not available'}")
+
+            if checkpoint_path and len(done) % 10 == 0:
+                save_checkpoint(checkpoint_path, done)
+
+    def worker():
+        try:
+            checker = checker_factory()
         except Exception as e:
-            print(f"Error with {title}: {e}")
+            # the remaining workers keep draining the queue
+            print(f"Could not start a checker session: {e}")
+            return
+
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    title = titles.get_nowait()
+                except queue.Empty:
+                    return
 
-def select_books_to_update(books):
+                for attempt in range(retries):
+                    bucket.acquire()
+
+                    try:
+                        available = checker.lookup(title)
+                        break
+                    except Exception as e:
+                        delay = backoff * 2 ** attempt + random.uniform(0, backoff)
+                        print(f"Error with {title} (attempt {attempt + 1}/{retries}): {e}; retrying in {delay:.1f}s")
+                        time.sleep(delay)
+                else:
+                    with lock:
+                        failed.append(title)
+                    continue
+
+                cache.set(title, available)
+                record(title, available)
+
+        finally:
+            checker.close()
+
+    threads = [
+        threading.Thread(target=worker, name=f"availability-worker-{i}")
+        for i in range(min(workers, len(todo)))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if checkpoint_path:
+        save_checkpoint(checkpoint_path, done)
+
+    if checked[0] + len(failed) < len(todo):
+        print(f"Time budget spent, {len(todo) - checked[0] - len(failed)} titles left for the next run")
+
+    if failed:
+        print(f"{len(failed)} titles failed after {retries} attempts: {failed}")
+
+    return done, failed
+
+def select_books_to_update(books, cache, budget_seconds, seconds_per_title):
     titles = [b["title"] for b in books.values()]
 
-    return titles[:500]   # start with 500/day
+    return RefreshScheduler(cache).plan(titles, budget_seconds, seconds_per_title)
 
 if __name__ == "__main__":
-    selected_titles = select_books_to_update(books)
-    update_availability_for_books(selected_titles)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Refresh library availability for reviewed books")
+    parser.add_argument("--workers", type=int, default=4, help="parallel sessions")
+    parser.add_argument("--fetcher", choices=["http", "selenium"], default="http",
+                        help="http falls back to a browser only for pages it can't read")
+    parser.add_argument("--rate", type=float, default=1.0, help="max catalog requests per second, all workers combined")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--budget-minutes", type=float, default=60, help="time allowed for this run")
+    parser.add_argument("--seconds-per-lookup", type=float, default=3.0,
+                        help="typical time one worker spends on a title, used to size the queue")
+    parser.add_argument("--no-resume", action="store_true", help="ignore today's checkpoint")
+    args = parser.parse_args()
+
+    cache = AvailabilityCache()
+    books = load_books(BOOKS_CSV)
+
+    if args.no_resume and os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
+
+    if args.fetcher == "http":
+        checker_factory = lambda: HttpAvailabilityChecker(fallback=LibraryAvailabilityChecker)
+    else:
+        checker_factory = LibraryAvailabilityChecker
+
+    budget_seconds = args.budget_minutes * 60
+    # throughput is capped by the rate limit or by the workers, whichever is lower
+    seconds_per_title = max(1 / args.rate, args.seconds_per_lookup / args.workers)
+
+    selected_titles = select_books_to_update(books, cache, budget_seconds, seconds_per_title)
+    print(f"Scheduled {len(selected_titles)} of {len(books)} titles")
+
+    update_availability_parallel(
+        selected_titles,
+        cache,
+        workers=args.workers,
+        rate=args.rate,
+        retries=args.retries,
+        checker_factory=checker_factory,
+        deadline=time.monotonic() + budget_seconds
+    )
+    cache.publish_update()
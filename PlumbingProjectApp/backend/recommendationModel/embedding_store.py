@@ -0,0 +1,186 @@
+import fcntl
+import hashlib
+from contextlib import contextmanager
+import json
+import os
+import uuid
+import numpy as np
+
+MANIFEST = "manifest.json"
+LOCK = "manifest.lock"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    On-disk review embeddings keyed by a hash of the review text.
+
+    Vectors live in append-only .npy shards that are memory-mapped on load;
+    manifest.json lists the shards and the hashes they hold, and its version
+    is bumped on every flush. A store built with a different model is ignored.
+    Several processes may flush into the same root: shards get unique names
+    and the manifest is re-read and extended under a file lock. compact()
+    merges the shards back into one.
+    """
+
+    def __init__(self, root, model_name):
+        self.root = root
+        self.model_name = model_name
+        self._pending = {}
+        self.reload()
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST)
+
+    def _read_manifest(self):
+        # the manifest for this model, or None
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if manifest.get("model_name") != self.model_name:
+            print(f"[EmbeddingStore] model changed ({manifest.get('model_name')} -> {self.model_name}), starting fresh")
+            return None
+
+        return manifest
+
+    def reload(self):
+        self.version = 0
+        self.dim = None
+        self._shard_files = []
+        self._shards = []
+        self._index = {}
+
+        manifest = self._read_manifest()
+        if manifest is None:
+            return
+
+        self.version = manifest["version"]
+        self.dim = manifest["dim"]
+
+        for shard_no, shard in enumerate(manifest["shards"]):
+            self._shard_files.append(shard)
+            self._shards.append(np.load(os.path.join(self.root, shard["file"]), mmap_mode="r"))
+
+            for row, h in enumerate(shard["hashes"]):
+                self._index[h] = (shard_no, row)
+
+    def __len__(self):
+        return len(self._index) + len(self._pending)
+
+    def __contains__(self, h):
+        return h in self._index or h in self._pending
+
+    def get(self, h):
+        if h in self._pending:
+            return self._pending[h]
+
+        loc = self._index.get(h)
+        if loc is None:
+            return None
+
+        shard_no, row = loc
+        return self._shards[shard_no][row]
+
+    def missing(self, hashes):
+        return [h for h in hashes if h not in self]
+
+    def put(self, h, vector):
+        self._pending[h] = np.asarray(vector, dtype=np.float32)
+
+    def _write_shard(self, vectors):
+        # unique per write, so concurrent writers never share a shard or tmp file
+        filename = f"shard-{uuid.uuid4().hex}.npy"
+        tmp = os.path.join(self.root, f"{filename}.{os.getpid()}.tmp")
+
+        with open(tmp, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp, os.path.join(self.root, filename))
+
+        return filename
+
+    def _write_manifest(self, version, dim, shards):
+        manifest = {
+            "version": version,
+            "model_name": self.model_name,
+            "dim": int(dim),
+            "shards": shards
+        }
+
+        tmp = f"{self._manifest_path()}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path())
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, LOCK), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def flush(self):
+        # writes everything put() since the last flush as one new shard
+        if not self._pending:
+            return
+
+        os.makedirs(self.root, exist_ok=True)
+
+        hashes = list(self._pending)
+        vectors = np.vstack([self._pending[h] for h in hashes]).astype(np.float32)
+        filename = self._write_shard(vectors)
+
+        with self._locked():
+            # another process may have flushed since our last reload
+            current = self._read_manifest() or {"version": 0, "shards": []}
+
+            self._write_manifest(
+                current["version"] + 1,
+                vectors.shape[1],
+                current["shards"] + [{"file": filename, "hashes": hashes}]
+            )
+
+        self._pending = {}
+        self.reload()
+
+    def compact(self):
+        # rewrites every flushed shard into one and deletes the old files.
+        # The manifest is re-read under the lock, so shards other processes
+        # flushed before that are kept; ones they flush after are added to the
+        # new manifest as usual. Meant for the offline build: a process still
+        # on the old manifest can't reload it once its shards are gone
+        if not os.path.isdir(self.root):
+            return
+
+        with self._locked():
+            current = self._read_manifest()
+            if current is None or len(current["shards"]) < 2:
+                return
+
+            hashes = []
+            blocks = []
+            seen = set()
+
+            for shard in current["shards"]:
+                # the same text can land in two shards when processes flush at once
+                rows = [row for row, h in enumerate(shard["hashes"]) if h not in seen]
+                seen.update(shard["hashes"])
+
+                vectors = np.load(os.path.join(self.root, shard["file"]), mmap_mode="r")
+                blocks.append(vectors[rows])
+                hashes.extend(shard["hashes"][row] for row in rows)
+
+            filename = self._write_shard(np.vstack(blocks).astype(np.float32))
+            self._write_manifest(current["version"] + 1, current["dim"], [{"file": filename, "hashes": hashes}])
+
+            for shard in current["shards"]:
+                os.remove(os.path.join(self.root, shard["file"]))
+
+        self.reload()
@@ -1,9 +1,19 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from recommendationModel.embedding_store import text_hash
 
 class EmbeddingBuilder:
-    def __init__(self, model_name="all-mpnet-base-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name="all-mpnet-base-v2", batch_size=64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+
+    @property
+    def model(self):
+        # loaded on first encode so a fully cached build never pays for it
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
 
     def embed_texts(self, texts):
         if not texts:
@@ -13,24 +23,71 @@ class EmbeddingBuilder:
             normalize_embeddings=True,
             show_progress_bar=False
         )
-    def build_book_embeddings(self, books, max_reviews=5):
-        book_embeddings = {}
 
+    def embed_batched(self, texts):
+        # length-sorted batches keep padding per batch small
+        if not texts:
+            return None
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = None
+
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            vecs = self.model.encode(
+                [texts[i] for i in chunk],
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[chunk] = vecs
+
+        return out
+
+    def select_texts(self, book, max_reviews=5):
+        reviews = [r for r in book["reviews"] if r["text"]]
+
+        reviews = sorted(
+            reviews,
+            key=lambda r: (r.get("stars", 3), r.get("sentiment", 0.5)),
+            reverse=True
+        )[:max_reviews]
+
+        return [r["text"] for r in reviews]
+
+    def build_book_embeddings(self, books, max_reviews=5, store=None):
+        # store: optional EmbeddingStore; only reviews it hasn't seen get encoded
+        selected = {}
         for book_id, book in books.items():
-            reviews = [r for r in book["reviews"] if r["text"]]
+            texts = self.select_texts(book, max_reviews)
+            if texts:
+                selected[book_id] = [text_hash(t) for t in texts], texts
 
-            if not reviews:
-                continue
+        # gather every text still needing a vector across all books,
+        # encode them as one stream, then scatter back per book
+        pending = {}
+        for hashes, texts in selected.values():
+            for h, t in zip(hashes, texts):
+                if h not in pending and (store is None or h not in store):
+                    pending[h] = t
 
-            reviews = sorted(
-                reviews,
-                key=lambda r: (r.get("stars", 3), r.get("sentiment", 0.5)),
-                reverse=True
-            )[:max_reviews]
+        vectors = {}
+        if pending:
+            encoded = self.embed_batched(list(pending.values()))
+            for h, vec in zip(pending, encoded):
+                if store is None:
+                    vectors[h] = vec
+                else:
+                    store.put(h, vec)
 
-            texts = [r["text"] for r in reviews]
+        lookup = vectors.get if store is None else store.get
 
-            vecs = self.embed_texts(texts)
+        book_embeddings = {}
+        for book_id, (hashes, texts) in selected.items():
+            vecs = np.vstack([lookup(h) for h in hashes])
 
             centroid = np.mean(vecs, axis=0)
 
@@ -44,4 +101,7 @@ class EmbeddingBuilder:
                 "variance": variance
             }
 
+        if store is not None:
+            store.flush()
+
         return book_embeddings
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class BookFeatureStore:
+    """
+    Per-book aggregates computed once from the review lists, indexed by the
+    book's position in book_ids. Rebuild with refresh() when books change.
+    """
+
+    def __init__(self, book_embeddings, books):
+        self.refresh(book_embeddings, books)
+
+    def refresh(self, book_embeddings, books):
+        self.book_ids = list(books)
+        self.positions = {bid: i for i, bid in enumerate(self.book_ids)}
+        n = len(self.book_ids)
+
+        # 0.5 / nan mean "no signal" and match the old per-call fallbacks
+        self.avg_sentiment = np.full(n, 0.5, dtype=np.float64)
+        self.avg_grade = np.full(n, np.nan, dtype=np.float64)
+        self.review_count = np.zeros(n, dtype=np.int64)
+        self.variance = np.zeros(n, dtype=np.float64)
+        self.genres = []
+
+        for i, book_id in enumerate(self.book_ids):
+            book = books[book_id]
+            reviews = book["reviews"]
+
+            self.review_count[i] = len(reviews)
+            self.genres.append(frozenset(book.get("genres") or []))
+
+            sentiments = [r["sentiment"] for r in reviews if r.get("sentiment") is not None]
+            if sentiments:
+                self.avg_sentiment[i] = np.mean(sentiments)
+
+            grades = []
+            for r in reviews:
+                grades.extend(r.get("recommended_grades") or [])
+            if grades:
+                self.avg_grade[i] = sum(grades) / len(grades)
+
+            emb = book_embeddings.get(book_id)
+            if emb is not None:
+                self.variance[i] = float(emb["variance"])
+
+    @classmethod
+    def from_arrays(cls, book_ids, genres, arrays):
+        # rebuild from precomputed columns (see artifacts.py) without the reviews
+        store = cls.__new__(cls)
+        store.book_ids = list(book_ids)
+        store.positions = {bid: i for i, bid in enumerate(store.book_ids)}
+        store.genres = [frozenset(g or []) for g in genres]
+
+        store.avg_sentiment = np.asarray(arrays["avg_sentiment"], dtype=np.float64)
+        store.avg_grade = np.asarray(arrays["avg_grade"], dtype=np.float64)
+        store.review_count = np.asarray(arrays["review_count"], dtype=np.int64)
+        store.variance = np.asarray(arrays["variance"], dtype=np.float64)
+
+        return store
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def __contains__(self, book_id):
+        return book_id in self.positions
+
+    def get(self, book_id):
+        i = self.positions.get(book_id)
+        if i is None:
+            return None
+
+        return {
+            "avg_sentiment": float(self.avg_sentiment[i]),
+            "avg_grade": None if np.isnan(self.avg_grade[i]) else float(self.avg_grade[i]),
+            "review_count": int(self.review_count[i]),
+            "genres": self.genres[i],
+            "variance": float(self.variance[i])
+        }
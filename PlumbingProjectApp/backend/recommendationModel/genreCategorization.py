@@ -1,9 +1,12 @@
+import os
 import requests
 import re
-import time
 
-WIKI_SEARCH_URL = "https://en.wikipedia.org/w/api.php"
-WIKI_PARSE_URL = "https://en.wikipedia.org/w/api.php"
+# MediaWiki action API; every lookup also takes an api_url argument
+WIKI_API_URL = os.environ.get("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+
+# MediaWiki returns page content for at most 50 titles per query
+MAX_TITLES_PER_QUERY = 50
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (BookRecommender/1.0; +https://example.com)"
@@ -22,33 +25,67 @@ CANONICAL_GENRES = {
     "literary-fiction": ["literary fiction", "contemporary", "realism"]
 }
 
-def safe_get_json(url, params=None):
+# keyword -> canonical genres listing it
+KEYWORD_GENRES = {}
+for _genre, _keywords in CANONICAL_GENRES.items():
+    for _kw in _keywords:
+        KEYWORD_GENRES.setdefault(_kw, []).append(_genre)
+
+# every keyword in one pass; the lookahead tries each position, so
+# overlapping occurrences are found too (same as `kw in text`, including
+# "dystopia" in "dystopian" and "war" in "award"); longest first
+KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in sorted(KEYWORD_GENRES, key=len, reverse=True)) + "))"
+)
+
+# at one position only the longest keyword is reported; the ones it
+# contains ("dystopia" in "dystopian") are in the text as well
+IMPLIED_KEYWORDS = {
+    kw: [k for k in KEYWORD_GENRES if k in kw]
+    for kw in KEYWORD_GENRES
+}
+
+NON_WORD_PATTERN = re.compile(r"[^\w\s-]")
+SPACE_PATTERN = re.compile(r"\s+")
+GENRE_FIELD_PATTERN = re.compile(r"\|\s*genre\s*=\s*(.+)")
+# a page titled like the book may be an album, film or song ("Thriller", "It")
+BOOK_INFOBOX_PATTERN = re.compile(
+    r"\{\{\s*Infobox[ _](book|novel|short[ _]story|book[ _]series|comic|manga|literary[ _]work)\b",
+    re.IGNORECASE
+)
+WIKI_LINK_PATTERN = re.compile(r"\[\[|\]\]")
+
+class WikiFetchError(Exception):
+    # the API could not be reached or answered badly (timeout, 429, 5xx, ...);
+    # unlike "no page" or "no genre", this says nothing about the book
+    pass
+
+def get_json(url, params=None, session=None):
     try:
-        r = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        r = (session or requests).get(url, params=params, headers=HEADERS, timeout=10)
+    except requests.RequestException as e:
+        raise WikiFetchError(f"{url} -> {e}") from e
 
-        if r.status_code != 200:
-            print(f"[HTTP ERROR] {r.status_code} for {url}")
-            return None
+    if r.status_code != 200:
+        raise WikiFetchError(f"HTTP {r.status_code} for {url}")
 
-        if not r.text or not r.text.strip():
-            print(f"[EMPTY RESPONSE] {url}")
-            return None
+    if not r.text or not r.text.strip():
+        raise WikiFetchError(f"Empty response from {url}")
 
+    try:
         return r.json()
-
-    except Exception as e:
-        print(f"[REQUEST FAILED] {url} -> {e}")
-        return None
+    except ValueError as e:
+        raise WikiFetchError(f"Invalid JSON from {url}") from e
 
 def normalize(text: str) -> str:
     if not text:
         return ""
     text = text.lower()
-    text = re.sub(r"[^\w\s-]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = NON_WORD_PATTERN.sub(" ", text)
+    text = SPACE_PATTERN.sub(" ", text).strip()
     return text
 
-def find_wiki_page(title: str):
+def find_wiki_page(title: str, session=None, api_url=WIKI_API_URL):
     params = {
         "action": "query",
         "list": "search",
@@ -56,10 +93,7 @@ def find_wiki_page(title: str):
         "format": "json"
     }
 
-    data = safe_get_json(WIKI_SEARCH_URL, params)
-
-    if not data:
-        return None
+    data = get_json(api_url, params, session)
 
     results = data.get("query", {}).get("search", [])
 
@@ -68,7 +102,7 @@ def find_wiki_page(title: str):
 
     return results[0].get("title")
 
-def fetch_wikitext(page_title: str):
+def fetch_wikitext(page_title: str, session=None, api_url=WIKI_API_URL):
     params = {
         "action": "parse",
         "page": page_title,
@@ -76,19 +110,142 @@ def fetch_wikitext(page_title: str):
         "format": "json"
     }
 
-    data = safe_get_json(WIKI_PARSE_URL, params)
-
-    if not data:
-        return ""
+    data = get_json(api_url, params, session)
 
     try:
         return data["parse"]["wikitext"]["*"]
     except:
         return ""
 
+def fetch_wikitexts(page_titles, session=None, api_url=WIKI_API_URL):
+    """
+    Wikitext for many pages, MAX_TITLES_PER_QUERY per request, following
+    redirects. Returns {requested title: wikitext}; missing pages are left out.
+    Raises WikiFetchError if a request fails.
+    """
+    page_titles = list(dict.fromkeys(t for t in page_titles if t))
+    texts = {}
+
+    for start in range(0, len(page_titles), MAX_TITLES_PER_QUERY):
+        chunk = page_titles[start:start + MAX_TITLES_PER_QUERY]
+        params = {
+            "action": "query",
+            "titles": "|".join(chunk),
+            "prop": "revisions",
+            "rvprop": "content",
+            "rvslots": "main",
+            "redirects": 1,
+            "format": "json",
+            "formatversion": 2
+        }
+
+        # requested title -> final page title, via normalization and redirects
+        aliases = {}
+        content = {}
+
+        while True:
+            data = get_json(api_url, params, session)
+
+            query = data.get("query", {})
+            for step in query.get("normalized", []) + query.get("redirects", []):
+                aliases[step["from"]] = step["to"]
+
+            for page in query.get("pages", []):
+                revisions = page.get("revisions")
+                if revisions:
+                    content[page["title"]] = revisions[0]["slots"]["main"].get("content", "")
+
+            # large responses are split; ask for the rest
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+
+        for title in chunk:
+            target = title
+            for _ in range(3):
+                if target not in aliases:
+                    break
+                target = aliases[target]
+
+            if target in content:
+                texts[title] = content[target]
+
+    return texts
+
+
+def resolve_genres_batch(books, session=None, map_fn=map, api_url=WIKI_API_URL):
+    """
+    Canonical genres for many (title, author) pairs in few requests: every
+    title is first looked up directly as a page, in batches, and used if
+    that page has a book infobox with a genre; the other books are searched
+    for (one search each, run through map_fn so callers can parallelize),
+    and the search hits are again fetched in batches.
+
+    [] means Wikipedia has no genres for the book. Books whose lookups
+    failed (WikiFetchError) are left out of the result, so callers don't
+    mistake an outage for "no genres".
+    """
+    books = list(dict.fromkeys(books))
+    results = {}
+    failed = set()
+
+    def fetch(titles):
+        # per chunk, so one failed request only loses its own titles
+        texts = {}
+        for start in range(0, len(titles), MAX_TITLES_PER_QUERY):
+            chunk = titles[start:start + MAX_TITLES_PER_QUERY]
+            try:
+                texts.update(fetch_wikitexts(chunk, session, api_url))
+            except WikiFetchError as e:
+                print(f"[Wikipedia Genre Error] {len(chunk)} pages: {e}")
+                failed.update(chunk)
+        return texts
+
+    titles = list(dict.fromkeys(title for title, _ in books))
+    texts = fetch(titles)
+    misses = []
+
+    for title, author in books:
+        if title in failed:
+            continue
+
+        text = texts.get(title, "")
+        raw = extract_genres(text) if BOOK_INFOBOX_PATTERN.search(text) else []
+        if raw:
+            results[(title, author)] = map_to_canonical(raw)
+        else:
+            misses.append((title, author))
+
+    def search(book):
+        title, author = book
+        try:
+            if author:
+                page = find_wiki_page(f"{title} {author}", session, api_url)
+                if page and normalize(title) in normalize(page):
+                    return page
+            return find_wiki_page(title, session, api_url)
+        except WikiFetchError as e:
+            print(f"[Wikipedia Genre Error] {title}: {e}")
+            return e
+
+    pages = dict(zip(misses, map_fn(search, misses)))
+    found = [p for p in pages.values() if isinstance(p, str)]
+    failed.clear()
+    texts = fetch(list(dict.fromkeys(found)))
+
+    for book in misses:
+        page = pages[book]
+        if isinstance(page, WikiFetchError) or page in failed:
+            continue
+
+        raw = extract_genres(texts.get(page, "")) if page else []
+        results[book] = map_to_canonical(raw) if raw else []
+
+    return results
+
 
 def extract_genres(wikitext: str):
-    match = re.search(r"\|\s*genre\s*=\s*(.+)", wikitext)
+    match = GENRE_FIELD_PATTERN.search(wikitext)
 
     if not match:
         return []
@@ -99,7 +256,7 @@ def extract_genres(wikitext: str):
     raw = raw.split("\n")[0]
 
     # clean wiki markup
-    raw = re.sub(r"\[\[|\]\]", "", raw)
+    raw = WIKI_LINK_PATTERN.sub("", raw)
     raw = raw.replace(" and ", ",").replace("&", ",")
 
     parts = [p.strip() for p in raw.split(",")]
@@ -110,17 +267,17 @@ def extract_genres(wikitext: str):
 def map_to_canonical(raw_genres):
     text = " ".join(raw_genres).lower()
 
-    scores = {}
+    found = set()
+    for match in KEYWORD_PATTERN.finditer(text):
+        found.update(IMPLIED_KEYWORDS[match.group(1)])
 
-    for genre, keywords in CANONICAL_GENRES.items():
-        score = 0
+    counts = {}
+    for kw in found:
+        for genre in KEYWORD_GENRES[kw]:
+            counts[genre] = counts.get(genre, 0) + 1
 
-        for kw in keywords:
-            if kw in text:
-                score += 1
-
-        if score > 0:
-            scores[genre] = score
+    # CANONICAL_GENRES order breaks ties
+    scores = {genre: counts[genre] for genre in CANONICAL_GENRES if genre in counts}
 
     if not scores:
         return ["literary-fiction"]  # safe fallback
@@ -128,53 +285,53 @@ def map_to_canonical(raw_genres):
     return sorted(scores, key=scores.get, reverse=True)[:3]
 
 
-def fetch_wikipedia_genres(title: str, author: str = None):
-    try:
-        title_page = find_wiki_page(title)
-        title_genres = []
-        title_score = 0
+def resolve_genres(title: str, author: str = None, session=None, api_url=WIKI_API_URL):
+    # canonical genres from the book's infobox, or [] if none were found
+    title_page = find_wiki_page(title, session, api_url)
+    title_genres = []
+    title_score = 0
 
-        if title_page:
-            wikitext = fetch_wikitext(title_page)
-            title_genres = extract_genres(wikitext)
-            title_score = len(title_genres)
+    if title_page:
+        wikitext = fetch_wikitext(title_page, session, api_url)
+        title_genres = extract_genres(wikitext)
+        title_score = len(title_genres)
 
-        author_genres = []
-        author_score = 0
+    author_genres = []
+    author_score = 0
 
-        if author:
-            query = f"{title} {author}"
-            author_page = find_wiki_page(query)
+    if author:
+        query = f"{title} {author}"
+        author_page = find_wiki_page(query, session, api_url)
 
-            if author_page and normalize(title) in normalize(author_page):
-                wikitext = fetch_wikitext(author_page)
-                author_genres = extract_genres(wikitext)
-                author_score = len(author_genres)
+        if author_page and normalize(title) in normalize(author_page):
+            wikitext = fetch_wikitext(author_page, session, api_url)
+            author_genres = extract_genres(wikitext)
+            author_score = len(author_genres)
 
-        raw_genres = []
+    raw_genres = []
 
-        if author_score > title_score and author_genres:
-            raw_genres = author_genres
-        else:
-            raw_genres = title_genres
+    if author_score > title_score and author_genres:
+        raw_genres = author_genres
+    else:
+        raw_genres = title_genres
+
+    if not raw_genres:
+        return []
 
-        if not raw_genres:
-            return ["literary-fiction"]
+    return map_to_canonical(raw_genres)
 
-        return map_to_canonical(raw_genres)
+
+def fetch_wikipedia_genres(title: str, author: str = None, session=None):
+    try:
+        return resolve_genres(title, author, session) or ["literary-fiction"]
 
     except Exception as e:
         print(f"[Wikipedia Genre Error] {title}: {e}")
         return ["literary-fiction"]
 
-def bulk_fetch(titles, delay=0.2):
-    results = {}
-
-    for t in titles:
-        results[t] = fetch_wikipedia_genres(t)
-        time.sleep(delay)
-
-    return results
+def bulk_fetch(titles):
+    resolved = resolve_genres_batch([(t, None) for t in titles])
+    return {t: resolved.get((t, None)) or ["literary-fiction"] for t in titles}
 
 if __name__ == "__main__":
     print(fetch_wikipedia_genres("Dune"))
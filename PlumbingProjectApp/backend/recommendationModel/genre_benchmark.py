@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for genre keyword matching over the CSV GENRE column.
+
+    cd backend
+    python -m recommendationModel.genre_benchmark --repeat 200
+
+Times map_to_canonical against the old per-keyword substring scan, and
+tokenize_genres, and lists any rows where the two matchers disagree (there
+should be none: the regex keeps the substring semantics).
+"""
+
+import argparse
+import os
+import time
+import pandas as pd
+from recommendationModel.genreCategorization import CANONICAL_GENRES, map_to_canonical
+from recommendationModel.parsing import tokenize_genres
+
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), "reviewedBooks.csv")
+
+
+def substring_map_to_canonical(raw_genres):
+    # the previous implementation, kept as the baseline
+    text = " ".join(raw_genres).lower()
+    scores = {}
+
+    for genre, keywords in CANONICAL_GENRES.items():
+        score = sum(1 for kw in keywords if kw in text)
+        if score > 0:
+            scores[genre] = score
+
+    if not scores:
+        return ["literary-fiction"]
+
+    return sorted(scores, key=scores.get, reverse=True)[:3]
+
+
+def load_genres(csv_path):
+    df = pd.read_csv(csv_path)
+    return df["GENRE"].dropna().astype(str).tolist()
+
+
+def time_calls(fn, rows, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for row in rows:
+            fn(row)
+    return len(rows) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--show", type=int, default=10, help="disagreeing rows to print")
+    args = parser.parse_args()
+
+    genres = load_genres(args.csv)
+    rows = [[g] for g in genres]
+    print(f"{len(rows)} GENRE values from {args.csv}\n")
+
+    print(f"{'matcher':<28}{'rows/s':>12}")
+    for name, fn in (
+        ("substring scan (old)", substring_map_to_canonical),
+        ("compiled regex", map_to_canonical),
+    ):
+        print(f"{name:<28}{time_calls(fn, rows, args.repeat):>12.0f}")
+    print(f"{'tokenize_genres':<28}{time_calls(tokenize_genres, genres, args.repeat):>12.0f}")
+
+    diffs = [
+        (row[0], substring_map_to_canonical(row), map_to_canonical(row))
+        for row in rows
+        if substring_map_to_canonical(row) != map_to_canonical(row)
+    ]
+    print(f"\n{len(diffs)} of {len(rows)} rows map differently")
+    for raw, old, new in diffs[:args.show]:
+        print(f"  {raw!r}: {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main()
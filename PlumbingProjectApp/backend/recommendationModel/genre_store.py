@@ -0,0 +1,164 @@
+"""
+Persistent Wikipedia genre cache and a bounded concurrent resolver.
+
+Genres are stored in SQLite keyed by normalized title/author. Books that
+Wikipedia has no genres for are cached too (as an empty list) and only
+looked up again after NEGATIVE_TTL. Misses are resolved with batched
+MediaWiki queries (see resolve_genres_batch); the per-book searches run on
+a small thread pool. Everything shares one pooled session behind a token
+bucket, so all workers together stay under `rate` requests per second.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from recommendationModel.genreCategorization import WIKI_API_URL, normalize, resolve_genres_batch
+from recommendationModel.kvstore import SQLiteKV
+from recommendationModel.ratelimit import TokenBucket
+
+GENRE_CACHE_PATH = os.environ.get(
+    "GENRE_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "cache", "genres.sqlite")
+)
+
+FALLBACK_GENRES = ["literary-fiction"]
+NEGATIVE_TTL = 7 * 24 * 3600
+
+def genre_key(title, author=None):
+    return f"{normalize(title)}::{normalize(author)}"
+
+
+class RateLimitedSession(requests.Session):
+    # every request (from any thread) takes a token first
+    def __init__(self, bucket, pool_size=8):
+        super().__init__()
+        self.bucket = bucket
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, *args, **kwargs):
+        self.bucket.acquire()
+        return super().request(*args, **kwargs)
+
+
+class GenreStore:
+    def __init__(self, path=GENRE_CACHE_PATH, negative_ttl=NEGATIVE_TTL):
+        self.kv = SQLiteKV(path, table="genres")
+        self.negative_ttl = negative_ttl
+
+    def get_many(self, keys):
+        # key -> genres ([] = known to have none); expired negatives are left out
+        now = time.time()
+        found = {}
+
+        for key, entry in self.kv.get_many(keys).items():
+            if not entry["genres"] and now - entry["checked_at"] > self.negative_ttl:
+                continue
+            found[key] = entry["genres"]
+
+        return found
+
+    def set_many(self, items):
+        now = time.time()
+        self.kv.set_many({
+            key: {"genres": genres, "checked_at": now}
+            for key, genres in items.items()
+        })
+
+
+class GenreResolver:
+    """
+    resolve_many() blocks until every book has genres (cached or fetched
+    concurrently); get() never waits on the network and schedules misses
+    in the background instead.
+    """
+
+    def __init__(self, store=None, workers=4, rate=5.0, api_url=WIKI_API_URL):
+        self.store = store or GenreStore()
+        self.api_url = api_url
+        self.session = RateLimitedSession(TokenBucket(rate, capacity=workers), pool_size=workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="genres")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _fetch(self, books, map_fn=map):
+        # only books that were actually resolved are stored; failed lookups
+        # stay uncached and are retried next time
+        try:
+            resolved = resolve_genres_batch(books, self.session, map_fn, self.api_url)
+        except Exception as e:
+            print(f"[GenreResolver] could not resolve {len(books)} books: {e}")
+            return {}
+
+        if len(resolved) < len(books):
+            print(f"[GenreResolver] {len(books) - len(resolved)} lookups failed, not cached")
+
+        self.store.set_many({genre_key(t, a): genres for (t, a), genres in resolved.items()})
+        return resolved
+
+    def resolve_many(self, books, fallback=True):
+        # books: iterable of (title, author) -> {(title, author): genres}.
+        # With fallback=False only real answers come back: [] when Wikipedia
+        # has no genres, and books whose lookup failed are left out.
+        books = list(dict.fromkeys(books))
+        cached = self.store.get_many([genre_key(t, a) for t, a in books])
+
+        results = {}
+        misses = []
+
+        for title, author in books:
+            genres = cached.get(genre_key(title, author))
+            if genres is not None:
+                results[(title, author)] = genres or (FALLBACK_GENRES if fallback else [])
+            else:
+                misses.append((title, author))
+
+        if misses:
+            print(f"[GenreResolver] fetching genres for {len(misses)} books")
+            fetched = self._fetch(misses, self._pool.map)
+
+            for book in misses:
+                if book in fetched:
+                    results[book] = fetched[book] or (FALLBACK_GENRES if fallback else [])
+                elif fallback:
+                    results[book] = FALLBACK_GENRES
+
+        return results
+
+    def get(self, title, author=None):
+        key = genre_key(title, author)
+        genres = self.store.get_many([key]).get(key)
+
+        if genres is not None:
+            return genres or FALLBACK_GENRES
+
+        with self._lock:
+            if key not in self._pending:
+                self._pending.add(key)
+                self._pool.submit(self._fetch_pending, key, title, author)
+
+        return FALLBACK_GENRES
+
+    def _fetch_pending(self, key, title, author):
+        try:
+            self._fetch([(title, author)])
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_genre_resolver():
+    # one store, pool and session per process
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = GenreResolver()
+        return _resolver
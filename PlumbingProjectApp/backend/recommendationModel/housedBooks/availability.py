@@ -1,12 +1,12 @@
 import urllib.parse
 import time
 import re
+import json
+import threading
 from difflib import SequenceMatcher
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
 
 SEARCH_BASE = "https://rgwd.search.bccls.org/search"
 MATCH_THRESHOLD = 0.85
@@ -32,8 +32,49 @@ def normalize_title(title: str) -> str:
 def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
+def best_match(title: str, card_titles):
+    # (score, card title) of the closest card, by normalized similarity
+    norm_query = normalize_title(title)
+
+    best_score = 0
+    best = None
+
+    for card_title in card_titles:
+        score = similarity(norm_query, normalize_title(card_title))
+        if score > best_score:
+            best_score = score
+            best = card_title
+
+    return best_score, best
+
+def build_search_url(title: str, search_base: str = SEARCH_BASE) -> str:
+    encoded = urllib.parse.quote(title)
+    return (
+        f"{search_base}"
+        "?universalLimiterIds=at_library"
+        "&materialTypeIds=1"
+        "&locationIds=119"
+        f"&query={encoded}"
+        "&searchType=everything"
+        "&pageSize=10"
+        "&mode=advanced"
+    )
+
 class LibraryAvailabilityChecker:
+    # Selenium is imported here rather than at module level so importing
+    # this module (or anything that imports it) never pulls in a browser
     def __init__(self):
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
+        self.By = By
+        self.EC = EC
+        self.TimeoutException = TimeoutException
+
         chrome_options = Options()
         chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--disable-gpu")
@@ -56,19 +97,11 @@ class LibraryAvailabilityChecker:
         self.wait = WebDriverWait(self.driver, 10)
 
     def _build_url(self, title: str) -> str:
-        encoded = urllib.parse.quote(title)
-        return (
-            f"{SEARCH_BASE}"
-            "?universalLimiterIds=at_library"
-            "&materialTypeIds=1"
-            "&locationIds=119"
-            f"&query={encoded}"
-            "&searchType=everything"
-            "&pageSize=10"
-            "&mode=advanced"
-        )
+        return build_search_url(title)
 
     def accept_cookies(self):
+        By, EC = self.By, self.EC
+
         try:
             accept_button = self.wait.until(
                 EC.element_to_be_clickable(
@@ -80,68 +113,206 @@ class LibraryAvailabilityChecker:
         except:
             print("No cookie popup found or already accepted.")
 
-    def availability(self, title: str) -> bool:
-        try:
-            url = self._build_url(title)
-            print("\nSearching:", url)
+    def lookup(self, title: str) -> bool:
+        # like availability(), but driver/network errors are raised so
+        # callers can retry; an empty result page is just "not available"
+        By, EC = self.By, self.EC
 
-            self.driver.get(url)
-            self.accept_cookies()
+        url = self._build_url(title)
+        print("\nSearching:", url)
 
+        self.driver.get(url)
+        self.accept_cookies()
+
+        try:
             self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "div.card.py-4.px-4"))
             )
+        except self.TimeoutException:
+            print("No book cards found")
+            return False
 
-            cards = self.driver.find_elements(By.CSS_SELECTOR, "div.card.py-4.px-4")
-            print(f"Found {len(cards)} book cards")
+        cards = self.driver.find_elements(By.CSS_SELECTOR, "div.card.py-4.px-4")
+        print(f"Found {len(cards)} book cards")
 
-            norm_query = normalize_title(title)
+        card_titles = []
 
-            best_score = 0
-            best_match = None
+        for card in cards:
+            try:
+                link = card.find_element(
+                    By.CSS_SELECTOR, "h2.card-title a.notranslate"
+                )
+                card_title = link.text.strip()
+
+                if card_title:
+                    card_titles.append(card_title)
 
-            for card in cards:
-                try:
-                    link = card.find_element(
-                        By.CSS_SELECTOR, "h2.card-title a.notranslate"
-                    )
-                    card_title = link.text.strip()
+            except Exception as e:
+                print("Error reading card:", e)
+                continue
 
-                    if not card_title:
-                        continue
+        # same matching as HttpAvailabilityChecker
+        best_score, match = best_match(title, card_titles)
 
-                    norm_card = normalize_title(card_title)
+        if best_score >= MATCH_THRESHOLD:
+            print(f"\nMatch found: '{match}' (score={best_score:.3f})")
+            return True
+        else:
+            print(f"\nNo good match (best score={best_score:.3f})")
+            return False
 
-                    score = similarity(norm_query, norm_card)
+    def availability(self, title: str) -> bool:
+        try:
+            return self.lookup(title)
+        except Exception as e:
+            print("Error:", e)
+            return False
+
+    def close(self):
+        self.driver.quit()
+
+class CardTitleParser(HTMLParser):
+    # collects the text of `h2.card-title a.notranslate`, the same element
+    # the Selenium checker reads
+    def __init__(self):
+        super().__init__()
+        self.titles = []
+        self._in_heading = False
+        self._in_link = False
+        self._text = []
 
-                    print(f"\nComparing:")
-                    print(f"  Query: {norm_query}")
-                    print(f"  Card : {norm_card}")
-                    print(f"  Score: {score:.3f}")
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get("class") or "").split()
 
-                    if score > best_score:
-                        best_score = score
-                        best_match = card_title
+        if tag == "h2" and "card-title" in classes:
+            self._in_heading = True
+        elif tag == "a" and self._in_heading and "notranslate" in classes:
+            self._in_link = True
+            self._text = []
 
-                except Exception as e:
-                    print("Error reading card:", e)
-                    continue
+    def handle_endtag(self, tag):
+        if tag == "a" and self._in_link:
+            self._in_link = False
+            text = " ".join("".join(self._text).split())
+            if text:
+                self.titles.append(text)
+        elif tag == "h2":
+            self._in_heading = False
 
-            if best_score >= MATCH_THRESHOLD:
-                print(f"\nMatch found: '{best_match}' (score={best_score:.3f})")
-                return True
+    def handle_data(self, data):
+        if self._in_link:
+            self._text.append(data)
+
+def _titles_from_json(data):
+    # search APIs nest results differently; take every "title" string
+    titles = []
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "title" and isinstance(value, str):
+                titles.append(value)
             else:
-                print(f"\nNo good match (best score={best_score:.3f})")
-                return False
+                titles.extend(_titles_from_json(value))
+
+    elif isinstance(data, list):
+        for item in data:
+            titles.extend(_titles_from_json(item))
+
+    return titles
+
+NO_RESULTS_MARKERS = ("no results", "0 results", "did not match any")
+
+class HttpAvailabilityChecker:
+    """
+    Availability over plain HTTP(S) with a pooled session: fetches the
+    catalog search page (or JSON) and matches card titles the same way as
+    LibraryAvailabilityChecker. If the response has no card markup and no
+    "no results" message (e.g. a JS-only shell), it falls back to a lazily
+    started Selenium checker from `fallback`, when given.
+    """
+
+    def __init__(self, search_base=SEARCH_BASE, timeout=10, pool_size=10, fallback=None):
+        self.search_base = search_base
+        self.timeout = timeout
+        self.fallback = fallback
+        self._fallback_checker = None
+
+        # no retries here: every attempt has to take a token from the
+        # caller's rate limiter, so the job's retry loop owns them
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (BookRecommender/1.0; availability check)",
+            "Accept": "text/html,application/json"
+        })
+
+    def fetch_titles(self, title: str):
+        # card titles on the result page, or None if the page can't be read without a browser
+        r = self.session.get(build_search_url(title, self.search_base), timeout=self.timeout)
+        r.raise_for_status()
+
+        if "json" in r.headers.get("Content-Type", ""):
+            return _titles_from_json(r.json())
+
+        parser = CardTitleParser()
+        parser.feed(r.text)
+
+        if parser.titles:
+            return parser.titles
 
+        if any(marker in r.text.lower() for marker in NO_RESULTS_MARKERS):
+            return []
+
+        return None
+
+    def lookup(self, title: str) -> bool:
+        titles = self.fetch_titles(title)
+
+        if titles is None:
+            if self.fallback is None:
+                raise RuntimeError(f"No card titles in search response for {title!r}")
+
+            if self._fallback_checker is None:
+                self._fallback_checker = self.fallback()
+            return self._fallback_checker.lookup(title)
+
+        score, match = best_match(title, titles)
+        return score >= MATCH_THRESHOLD
+
+    def availability(self, title: str) -> bool:
+        try:
+            return self.lookup(title)
         except Exception as e:
             print("Error:", e)
             return False
 
     def close(self):
-        self.driver.quit()
+        self.session.close()
+        if self._fallback_checker is not None:
+            self._fallback_checker.close()
+
+_checker = None
+_checker_lock = threading.Lock()
+
+def start():
+    # starts the shared browser session; avail() calls this on first use
+    global _checker
+
+    with _checker_lock:
+        if _checker is None:
+            _checker = LibraryAvailabilityChecker()
+        return _checker
+
+def stop():
+    global _checker
 
-_checker = LibraryAvailabilityChecker()
+    with _checker_lock:
+        if _checker is not None:
+            _checker.close()
+            _checker = None
 
 def avail(title: str) -> bool:
-    return _checker.availability(title)
\ No newline at end of file
+    return start().availability(title)
\ No newline at end of file
@@ -20,31 +20,117 @@
 
 import redis
 import json
+import zlib
+import threading
+from collections import Counter
 from typing import List, Tuple
-from recommendationModel.housedBooks.availability import avail
 import time
 
+AVAILABILITY_CHANNEL = "availability-updated"
+EXPOSURE_KEY = "availability:exposure"
+
 class AvailabilityCache:
+    # entries live in a fixed number of Redis hashes (field = lowercased title)
+    # so any number of titles can be read with one pipelined round trip
+    SHARDS = 64
+
     def __init__(self, redis_host="localhost", redis_port=6379):
         self.redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
 
     def _key(self, title: str) -> str:
+        # legacy one-key-per-title layout, still read as a fallback
         return f"availability:{title.lower()}"
 
-    def get(self, title: str):
-        value = self.redis.get(self._key(title))
+    def _shard(self, title: str) -> str:
+        return f"availability:shard:{zlib.crc32(title.lower().encode('utf-8')) % self.SHARDS}"
+
+    def _decode(self, value):
         if value is None:
             return None
-        
-        data = json.loads(value)
-        return data
+        try:
+            return json.loads(value)
+        except (TypeError, ValueError):
+            return value
+
+    def get(self, title: str):
+        return self.get_many([title])[title]
+
+    def get_many(self, titles):
+        titles = list(dict.fromkeys(titles))
+        if not titles:
+            return {}
+
+        by_shard = {}
+        for title in titles:
+            by_shard.setdefault(self._shard(title), []).append(title)
+
+        pipe = self.redis.pipeline(transaction=False)
+        for shard, shard_titles in by_shard.items():
+            pipe.hmget(shard, [t.lower() for t in shard_titles])
+
+        results = {}
+        for shard_titles, values in zip(by_shard.values(), pipe.execute()):
+            for title, value in zip(shard_titles, values):
+                results[title] = self._decode(value)
+
+        missing = [t for t in titles if results[t] is None]
+        if missing:
+            for title, value in zip(missing, self.redis.mget([self._key(t) for t in missing])):
+                results[title] = self._decode(value)
+
+        return results
 
     def set(self, title: str, available: bool):
-        data = {
-            "available": available,
-            "timestamp": time.time()
-        }
-        self.redis.set(self._key(title), json.dumps(data))
+        self.set_many({title: available})
+
+    def set_many(self, items):
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+
+        for title, available in items.items():
+            data = {
+                "available": available,
+                "timestamp": now
+            }
+            pipe.hset(self._shard(title), title.lower(), json.dumps(data))
+
+        pipe.execute()
+
+    def get_all(self):
+        # every hashed entry, keyed by lowercased title
+        pipe = self.redis.pipeline(transaction=False)
+        for shard in range(self.SHARDS):
+            pipe.hgetall(f"availability:shard:{shard}")
+
+        results = {}
+        for entries in pipe.execute():
+            for field, value in entries.items():
+                results[field] = self._decode(value)
+
+        return results
+
+    def record_exposure(self, counts):
+        # how often each title was shown in recommendations; the refresh
+        # scheduler checks frequently shown titles first
+        if not counts:
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for title, n in counts.items():
+            pipe.hincrby(EXPOSURE_KEY, title.lower(), n)
+        pipe.execute()
+
+    def get_exposure(self, titles):
+        titles = list(dict.fromkeys(titles))
+        if not titles:
+            return {}
+
+        values = self.redis.hmget(EXPOSURE_KEY, [t.lower() for t in titles])
+        return {title: int(value or 0) for title, value in zip(titles, values)}
+
+    def publish_update(self):
+        # tells every AvailabilitySnapshot to reload
+        self.redis.publish(AVAILABILITY_CHANNEL, str(time.time()))
 
     def is_stale(self, title: str, max_age_hours=24):
         data = self.get(title)
@@ -54,44 +140,157 @@ class AvailabilityCache:
         age = time.time() - data["timestamp"]
         return age > max_age_hours * 3600
 
+def _to_available(data):
+    if data is None:
+        return None
+
+    if isinstance(data, dict):
+        return data.get("available")
+
+    elif isinstance(data, bool):
+        return data
+
+    elif isinstance(data, int):
+        return bool(data)
+
+    elif isinstance(data, str):
+        if data in ["1", "true", "True"]:
+            return True
+        elif data in ["0", "false", "False"]:
+            return False
+
+    return None
+
 class AvailabilityService:
     def __init__(self, cache: AvailabilityCache):
         self.cache = cache
 
     def check(self, title: str):
-        data = self.cache.get(title)
+        return _to_available(self.cache.get(title))
 
-        if data is None:
-            return None  # unknown
+    def check_bulk(self, titles):
+        # one pipelined read (plus one MGET for legacy keys) per call
+        data = self.cache.get_many(titles)
+        return {title: _to_available(data.get(title)) for title in titles}
+
+    def record_exposure(self, titles):
+        self.cache.record_exposure(Counter(titles))
+
+class AvailabilitySnapshot:
+    """
+    In-process copy of the availability hashes so re-ranking does no network
+    I/O. Reloaded by a background thread on every "availability-updated"
+    message and at least every refresh_seconds. Titles the snapshot doesn't
+    know fall back to the wrapped AvailabilityService (i.e. Redis).
+    """
+
+    def __init__(self, service: AvailabilityService, refresh_seconds=3600):
+        self.service = service
+        self.refresh_seconds = refresh_seconds
+        self._data = {}
+        self._misses = set()
+        self._exposure = Counter()
+        self._exposure_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.loaded_at = None
+
+    def load(self):
+        data = {
+            title: _to_available(value)
+            for title, value in self.service.cache.get_all().items()
+        }
+        # swap whole dicts; readers never see a half-built snapshot
+        self._data = data
+        self._misses = set()
+        self.loaded_at = time.time()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        try:
+            self.load()
+        except Exception as e:
+            print(f"[AvailabilitySnapshot] initial load failed: {e}")
+
+        self._thread = threading.Thread(target=self._run, name="availability-snapshot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        pubsub = None
+
+        while not self._stop.is_set():
+            try:
+                if pubsub is None:
+                    pubsub = self.service.cache.redis.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(AVAILABILITY_CHANNEL)
+
+                # returns on a publish or after the timeout; reload either way
+                pubsub.get_message(timeout=self.refresh_seconds)
+                self.load()
+                self.flush_exposure()
+
+            except Exception as e:
+                print(f"[AvailabilitySnapshot] refresh failed: {e}")
+                pubsub = None
+                self._stop.wait(min(60, self.refresh_seconds))
+
+    def record_exposure(self, titles):
+        # counted in memory and written by the refresh thread, so the
+        # request path still does no Redis I/O
+        with self._exposure_lock:
+            self._exposure.update(titles)
+
+    def flush_exposure(self):
+        with self._exposure_lock:
+            counts, self._exposure = self._exposure, Counter()
+
+        try:
+            self.service.cache.record_exposure(counts)
+        except Exception as e:
+            print(f"[AvailabilitySnapshot] exposure flush failed: {e}")
+            with self._exposure_lock:
+                self._exposure.update(counts)
 
-        return data["available"]
+    def check(self, title: str):
+        return self.check_bulk([title])[title]
 
     def check_bulk(self, titles):
+        data = self._data
+        misses = self._misses
+
         results = {}
+        unknown = []
 
         for title in titles:
-            data = self.cache.get(title)
-
-            if data is None:
+            key = title.lower()
+            if key in data:
+                results[title] = data[key]
+            elif key in misses:
                 results[title] = None
-                continue
+            else:
+                unknown.append(title)
 
-            if isinstance(data, dict):
-                results[title] = data.get("available")
+        if unknown:
+            try:
+                fetched = self.service.check_bulk(unknown)
+            except Exception as e:
+                print(f"[AvailabilitySnapshot] fallback lookup failed: {e}")
+                fetched = {}
 
-            elif isinstance(data, int):
-                results[title] = bool(data)
+            for title in unknown:
+                value = fetched.get(title)
+                results[title] = value
 
-            elif isinstance(data, str):
-                if data in ["1", "true", "True"]:
-                    results[title] = True
-                elif data in ["0", "false", "False"]:
-                    results[title] = False
+                if value is None:
+                    misses.add(title.lower())
                 else:
-                    results[title] = None
-
-            else:
-                results[title] = None
+                    data[title.lower()] = value
 
         return results
 
@@ -146,4 +345,13 @@ class ContextAwareRecommender:
                 adjusted.append((book_id, adjusted_score))
 
             adjusted.sort(key=lambda x: x[1], reverse=True)
-            return adjusted[:top_k]
\ No newline at end of file
+            adjusted = adjusted[:top_k]
+
+            try:
+                self.availability_service.record_exposure(
+                    [self.books[bid]["title"] for bid, _ in adjusted]
+                )
+            except Exception as e:
+                print(f"[ContextAwareRecommender] could not record exposure: {e}")
+
+            return adjusted
\ No newline at end of file
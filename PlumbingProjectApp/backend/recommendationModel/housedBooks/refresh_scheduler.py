@@ -0,0 +1,67 @@
+import math
+import time
+from recommendationModel.housedBooks.modelIncorp import _to_available
+
+
+class RefreshScheduler:
+    """
+    Orders titles for the daily availability refresh. A title's priority
+    mixes how stale its cached entry is (never-checked titles count as
+    fully stale), how often it has been recommended, and whether it was
+    last seen available (those are the ones that may have gone out).
+    Titles checked within min_age_hours are skipped.
+    """
+
+    def __init__(
+        self,
+        cache,
+        min_age_hours=20,
+        max_age_hours=30 * 24,
+        staleness_weight=1.0,
+        exposure_weight=0.5,
+        available_weight=0.25
+    ):
+        self.cache = cache
+        self.min_age_hours = min_age_hours
+        self.max_age_hours = max_age_hours
+        self.staleness_weight = staleness_weight
+        self.exposure_weight = exposure_weight
+        self.available_weight = available_weight
+
+    def rank(self, titles, now=None):
+        # [(priority, title)], highest first, fresh titles left out
+        now = now or time.time()
+        titles = list(dict.fromkeys(titles))
+
+        entries = self.cache.get_many(titles)
+        exposure = self.cache.get_exposure(titles)
+        max_exposure = math.log1p(max(exposure.values(), default=0)) or 1.0
+
+        ranked = []
+
+        for title in titles:
+            data = entries.get(title)
+            timestamp = data.get("timestamp") if isinstance(data, dict) else None
+
+            if timestamp is None:
+                staleness = 1.0
+            else:
+                age_hours = (now - timestamp) / 3600
+                if age_hours < self.min_age_hours:
+                    continue
+                staleness = min(age_hours / self.max_age_hours, 1.0)
+
+            priority = (
+                self.staleness_weight * staleness
+                + self.exposure_weight * math.log1p(exposure.get(title, 0)) / max_exposure
+                + self.available_weight * (_to_available(data) is True)
+            )
+            ranked.append((priority, title))
+
+        ranked.sort(key=lambda x: x[0], reverse=True)
+        return ranked
+
+    def plan(self, titles, budget_seconds, seconds_per_title, now=None):
+        # the highest-priority titles that fit in the time budget
+        limit = int(budget_seconds / seconds_per_title)
+        return [title for _, title in self.rank(titles, now)[:limit]]
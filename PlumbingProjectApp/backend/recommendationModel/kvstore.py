@@ -0,0 +1,67 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteKV:
+    """
+    Small persistent key -> JSON value table on a local SQLite file.
+    Shared by the sentiment and genre caches; safe to use from threads.
+    """
+
+    def __init__(self, path, table="kv"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys, max_age=None):
+        # max_age (seconds): older rows are treated as missing
+        keys = list(keys)
+        found = {}
+        cutoff = None if max_age is None else time.time() - max_age
+
+        with self._lock:
+            # sqlite caps bound parameters per statement
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value, updated_at FROM {self.table} WHERE key IN ({marks})",
+                    chunk
+                ).fetchall()
+
+                for key, value, updated_at in rows:
+                    if cutoff is not None and updated_at < cutoff:
+                        continue
+                    found[key] = json.loads(value)
+
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        now = time.time()
+        rows = [(k, json.dumps(v), now) for k, v in items.items()]
+
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, updated_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
@@ -1,10 +1,86 @@
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from recommendationModel.features import BookFeatureStore
+from recommendationModel.scoring import ScoringEngine, pack_centroids, top_k_indices, unpack_review_vectors
+from recommendationModel.ann import build_index
 
 class HybridRecommender:
-    def __init__(self, book_embeddings, books):
+    def __init__(self, book_embeddings, books, index_kind="auto", candidate_pool=200, features=None, packed=None):
+        # index_kind: "auto" | "exact" | "ivf" | "hnsw", see ann.build_index
+        # features / packed: precomputed BookFeatureStore and (vectors, offsets),
+        # as returned by artifacts.load_artifacts
+        self.index_kind = index_kind
+        self.candidate_pool = candidate_pool
+        self.refresh(book_embeddings, books, features=features, packed=packed)
+
+    def refresh(self, book_embeddings, books, features=None, packed=None):
         self.book_embeddings = book_embeddings
         self.books = books
+        if features is None:
+            features = BookFeatureStore(book_embeddings, books)
+        self.features = features
+        self.engine = ScoringEngine(book_embeddings, self.features, packed=packed)
+        self.index = build_index(
+            self.engine.unit_vectors,
+            self.engine.owners,
+            len(self.engine.book_ids),
+            kind=self.index_kind
+        )
+
+    def to_snapshot(self):
+        # plain arrays + books table, see snapshot.encode_snapshot;
+        # review text is dropped, it is only needed to build embeddings
+        engine = self.engine
+        dim = engine.vectors.shape[1] if engine.vectors.size else 0
+
+        books = {
+            bid: {
+                "title": b["title"],
+                "author": b.get("author"),
+                "genres": list(b.get("genres") or []),
+                "reviews": [
+                    {
+                        "stars": r.get("stars"),
+                        "recommended_grades": r.get("recommended_grades") or [],
+                        "sentiment": r.get("sentiment")
+                    }
+                    for r in b["reviews"]
+                ]
+            }
+            for bid, b in self.books.items()
+        }
+
+        return {
+            "book_ids": list(engine.book_ids),
+            "books": books,
+            "arrays": {
+                "vectors": engine.vectors,
+                "offsets": engine.offsets,
+                "centroids": pack_centroids(engine.book_ids, self.book_embeddings, dim),
+                "avg_sentiment": self.features.avg_sentiment,
+                "avg_grade": self.features.avg_grade,
+                "review_count": self.features.review_count,
+                "variance": self.features.variance
+            }
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **kwargs):
+        book_ids = snapshot["book_ids"]
+        books = {bid: snapshot["books"][bid] for bid in book_ids}
+        arrays = snapshot["arrays"]
+
+        features = BookFeatureStore.from_arrays(book_ids, [books[b]["genres"] for b in book_ids], arrays)
+        book_embeddings = unpack_review_vectors(
+            book_ids, arrays["vectors"], arrays["offsets"], arrays["centroids"], arrays["variance"]
+        )
+
+        return cls(
+            book_embeddings,
+            books,
+            features=features,
+            packed=(arrays["vectors"], arrays["offsets"]),
+            **kwargs
+        )
 
     def build_user_profile(self, user_reviews):
         vectors = []
@@ -17,18 +93,6 @@ class HybridRecommender:
             if book_id not in self.book_embeddings:
                 continue
 
-            book = self.books[book_id]
-
-            sentiments = [
-                rev.get("sentiment", 0.5)
-                for rev in book["reviews"]
-                if rev.get("sentiment") is not None
-            ]
-
-            avg_sentiment = np.mean(sentiments) if sentiments else 0
-
-            sentiment_weight = avg_sentiment
-
             centered = (stars - 3) / 2
             final_weight = centered
             
@@ -47,37 +111,6 @@ class HybridRecommender:
 
         return np.sum(vectors * weights, axis=0) / weight_sum
 
-    def sentiment_score(self, book):
-        sentiments = [
-            r.get("sentiment")
-            for r in book["reviews"]
-            if r.get("sentiment") is not None
-        ]
-
-        if not sentiments:
-            return 0.5
-
-        avg = np.mean(sentiments)
-
-        return avg
-
-
-    def genre_score(self, user_genres, book_genres):
-        if not user_genres or not book_genres:
-            return 0.3
-        return len(set(user_genres) & set(book_genres)) / len(set(user_genres))
-
-    def grade_score(self, user_grade, book):
-        grades = []
-        for r in book["reviews"]:
-            grades.extend(r["recommended_grades"])
-
-        if not grades:
-            return 0.5
-
-        avg = sum(grades) / len(grades)
-        return max(0, 1 - abs(float(user_grade) - avg) / 6)
-
     def adaptive_weights(self, user_profile, user_reviews):
         #return so weights sum to 1
         n_reviews = len(user_reviews)
@@ -101,55 +134,34 @@ class HybridRecommender:
 
         return weights
 
-    def semantic_similarity(self, user_profile, book_id):
-        # soft max similarity
-        book = self.book_embeddings[book_id]
-        vecs = book["review_vectors"]
-
-        sims = cosine_similarity(
-            user_profile.reshape(1, -1),
-            vecs
-        )[0]
-
-        # soft-top-k pooling
-        top = np.sort(sims)[-3:]
-        return float(np.mean(top))
-
-    def recommend(self, user_profile, user_reviews, user_genres, user_grade, top_k=10):
+    def rank(self, user_profile, user_reviews, user_genres, user_grade, top_k=50):
+        # deterministic top_k as (positions into engine.book_ids, scores), best first
         weights = self.adaptive_weights(user_profile, user_reviews)
-        scores = []
 
-        for book_id in self.books:
-            book = self.books[book_id]
+        # large catalogs: only the ANN candidate set gets the full hybrid score,
+        # plus the books without review vectors, which the index can't return
+        idx = None
+        if self.index is not None:
+            idx = self.index.search(user_profile, max(self.candidate_pool, top_k))
+            idx = np.union1d(idx, self.engine.unembedded)
 
-            genre = self.genre_score(user_genres, book["genres"])
-            grade = self.grade_score(user_grade, book)
-            sentiment = self.sentiment_score(book)
+        scores = self.engine.hybrid_scores(user_profile, user_genres, user_grade, weights, idx=idx)
 
-            if book_id in self.book_embeddings:
-                sim = self.semantic_similarity(user_profile, book_id)
-                uncertainty = self.book_embeddings[book_id]["variance"]
-            else:
-                sim = 0
-                uncertainty = 0
-            
-            final = (
-                weights["embedding"] * sim +
-                weights["genre"] * genre +
-                weights["grade"] * grade +
-                weights["sentiment"] * sentiment
-            )
+        order = top_k_indices(scores, top_k)
+        positions = order if idx is None else idx[order]
 
-            final *= np.exp(-0.3 * uncertainty)
+        return positions, scores[order]
 
-            scores.append((book_id, final))
+    def cold_start_rank(self, user_genres, user_grade, top_k=10):
+        scores = self.engine.cold_start_scores(user_genres, user_grade)
 
-        scores = sorted(scores, key=lambda x: x[1], reverse=True)
+        order = top_k_indices(scores, top_k)
+        return order, scores[order]
 
-        candidates = scores[:50]
+    def recommend(self, user_profile, user_reviews, user_genres, user_grade, top_k=10):
+        positions, vals = self.rank(user_profile, user_reviews, user_genres, user_grade, top_k=50)
 
-        ids, vals = zip(*candidates)
-        vals = np.array(vals)
+        ids = [self.engine.book_ids[i] for i in positions]
 
         # temperature controls exploration
         temperature = 0.05
@@ -161,18 +173,5 @@ class HybridRecommender:
         return [(ids[i], float(vals[i])) for i in chosen]
     
     def cold_start_recommend(self, user_genres, user_grade, top_k=10):
-        scores = []
-
-        for book_id, book in self.books.items():
-            genre_score = self.genre_score(user_genres, book["genres"])
-            grade_score = self.grade_score(user_grade, book)
-
-            final_score = (
-                0.7 * genre_score +
-                0.3 * grade_score
-            )
-
-            scores.append((book_id, final_score))
-
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
+        positions, vals = self.cold_start_rank(user_genres, user_grade, top_k)
+        return [(self.engine.book_ids[i], float(v)) for i, v in zip(positions, vals)]
\ No newline at end of file
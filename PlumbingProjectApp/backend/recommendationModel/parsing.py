@@ -2,14 +2,17 @@ import pandas as pd
 import re
 from collections import defaultdict
 # from sentiment import ReviewSentimentAnalyzer
-from recommendationModel.sentiment import ReviewSentimentAnalyzer
+from recommendationModel.sentiment import get_analyzer
+from recommendationModel.genre_store import get_genre_resolver
 
-analyzer = ReviewSentimentAnalyzer()
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+SPACE_PATTERN = re.compile(r"\s+")
+GENRE_SEPARATOR_PATTERN = re.compile(r"[,/&]")
 
 def normalize_text(text: str) -> str:
     text = text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    text = NON_WORD_PATTERN.sub(" ", text)
+    text = SPACE_PATTERN.sub(" ", text)
     return text.strip()
 
 def tokenize_genres(raw_genre):
@@ -17,7 +20,7 @@ def tokenize_genres(raw_genre):
         return []
 
     raw = normalize_text(raw_genre)
-    parts = re.split(r"[,/&]", raw)
+    parts = GENRE_SEPARATOR_PATTERN.split(raw)
 
     tokens = set()
     for part in parts:
@@ -38,9 +41,6 @@ def load_books(csv_path):
         book_id = make_book_id(row["TITLE"], row["AUTHOR"])
         genres = tokenize_genres(row["GENRE"])
 
-        if not genres:
-            genres = fetch_wikipedia_genres(row["TITLE"], row["AUTHOR"])
-
         books[book_id] = {
             "title": row["TITLE"].strip(),
             "author": row["AUTHOR"].strip(),
@@ -48,6 +48,13 @@ def load_books(csv_path):
             "reviews": []
         }
 
+    # books without a usable GENRE column: cached or fetched concurrently
+    missing = [b for b in books.values() if not b["genres"]]
+    if missing:
+        resolved = get_genre_resolver().resolve_many((b["title"], b["author"]) for b in missing)
+        for book in missing:
+            book["genres"] = resolved[(book["title"], book["author"])]
+
     return books
 
 def load_reviews(csv_path, books):
@@ -64,6 +71,9 @@ def load_reviews(csv_path, books):
 
     df = df.dropna(subset=["TITLE", "AUTHOR", "REVIEW"])
 
+    added = []
+    raw_texts = []
+
     for _, row in df.iterrows():
         book_id = make_book_id(row["TITLE"], row["AUTHOR"])
 
@@ -74,10 +84,8 @@ def load_reviews(csv_path, books):
                     break
             else:
                 continue
-        
-        sentiment = analyzer.score(row["REVIEW"])
 
-        books[book_id]["reviews"].append({
+        review = {
             "stars": int(row["STARS"]) if not pd.isna(row["STARS"]) else None,
             "grade": int(row["GRADE"]) if not pd.isna(row["GRADE"]) else None,
             "recommended_grades": (
@@ -86,8 +94,15 @@ def load_reviews(csv_path, books):
                 else []
             ),
             "text": normalize_text(row["REVIEW"]),
-            "sentiment": sentiment
-        })
+            "sentiment": None
+        }
+        books[book_id]["reviews"].append(review)
+        added.append(review)
+        raw_texts.append(row["REVIEW"])
+
+    # one batched, cached pass instead of scoring row by row
+    for review, sentiment in zip(added, get_analyzer().score_batch(raw_texts)):
+        review["sentiment"] = sentiment
 
     return books
 # def search_books(reviews_dict, query):
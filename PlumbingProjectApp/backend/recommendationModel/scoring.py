@@ -0,0 +1,246 @@
+import threading
+import numpy as np
+
+
+def pack_review_vectors(book_ids, book_embeddings):
+    # stacks every book's review vectors into one float32 matrix;
+    # rows offsets[i]:offsets[i + 1] belong to book_ids[i]
+    counts = np.zeros(len(book_ids), dtype=np.int64)
+    blocks = []
+
+    for i, book_id in enumerate(book_ids):
+        emb = book_embeddings.get(book_id)
+        if emb is None:
+            continue
+
+        vecs = np.asarray(emb["review_vectors"], dtype=np.float32)
+        if vecs.ndim == 1:
+            vecs = vecs.reshape(1, -1)
+
+        counts[i] = len(vecs)
+        blocks.append(vecs)
+
+    offsets = np.zeros(len(book_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    if blocks:
+        vectors = np.ascontiguousarray(np.vstack(blocks), dtype=np.float32)
+    else:
+        vectors = np.zeros((0, 0), dtype=np.float32)
+
+    return vectors, offsets
+
+
+def unpack_review_vectors(book_ids, vectors, offsets, centroids, variance):
+    # inverse of pack_review_vectors; review_vectors are views, not copies
+    book_embeddings = {}
+
+    for i, book_id in enumerate(book_ids):
+        start, end = offsets[i], offsets[i + 1]
+        if end > start:
+            book_embeddings[book_id] = {
+                "review_vectors": vectors[start:end],
+                "centroid": centroids[i],
+                "variance": float(variance[i])
+            }
+
+    return book_embeddings
+
+
+def pack_centroids(book_ids, book_embeddings, dim):
+    centroids = np.zeros((len(book_ids), dim), dtype=np.float32)
+
+    for i, book_id in enumerate(book_ids):
+        if book_id in book_embeddings:
+            centroids[i] = book_embeddings[book_id]["centroid"]
+
+    return centroids
+
+
+class ScoringEngine:
+    """
+    Column-oriented view of the catalog so a whole request is scored with a
+    few array ops instead of a Python loop over every book.
+    """
+
+    TOP_SIMS = 3
+
+    def __init__(self, book_embeddings, features, packed=None):
+        # packed: optional (vectors, offsets) already in book order, e.g. mmapped
+        self.features = features
+        self.book_ids = features.book_ids
+        self.positions = features.positions
+
+        if packed is None:
+            packed = pack_review_vectors(self.book_ids, book_embeddings)
+        self.vectors, self.offsets = packed
+        self.counts = np.diff(self.offsets)
+        self.has_embedding = self.counts > 0
+        # not in any ANN index; scored on genre, grade and sentiment alone
+        self.unembedded = np.flatnonzero(~self.has_embedding)
+
+        # rows are pre-normalized so a single matmul gives cosine similarity;
+        # encoder output already is, in which case the (mmapped) matrix is reused
+        norms = np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        if np.allclose(norms, 1.0, atol=1e-3):
+            self.unit_vectors = self.vectors
+        else:
+            norms[norms == 0] = 1.0
+            self.unit_vectors = self.vectors / norms
+
+        self.variance = features.variance
+        self.decay = np.exp(-0.3 * self.variance)
+        self.avg_sentiment = features.avg_sentiment
+        self.avg_grade = features.avg_grade
+
+        self._build_genre_bits()
+        self._build_segments()
+
+        # score buffers are reused per worker thread instead of per request
+        self._local = threading.local()
+
+    def _buffer(self, name, size, dtype=np.float64):
+        buf = getattr(self._local, name, None)
+        if buf is None or len(buf) < size:
+            buf = np.empty(size, dtype=dtype)
+            setattr(self._local, name, buf)
+        return buf[:size]
+
+    def _build_genre_bits(self):
+        genres = self.features.genres
+        vocab = sorted(set().union(*genres)) if genres else []
+        self.genre_bit = {g: i for i, g in enumerate(vocab)}
+
+        n_words = max(1, (len(vocab) + 63) // 64)
+        self.genre_bits = np.zeros((len(self.book_ids), n_words), dtype=np.uint64)
+        self.has_genres = np.zeros(len(self.book_ids), dtype=bool)
+
+        for i, book_genres in enumerate(genres):
+            if book_genres:
+                self.has_genres[i] = True
+            for g in book_genres:
+                bit = self.genre_bit[g]
+                self.genre_bits[i, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+    def _build_segments(self):
+        # padded (n_books, max_reviews) index into the similarity vector;
+        # padding points at a trailing -inf slot so it never wins the top-k
+        n_rows = len(self.vectors)
+        width = int(self.counts.max()) if len(self.counts) else 0
+
+        self.segments = np.full((len(self.book_ids), width), n_rows, dtype=np.int64)
+        self.owners = np.repeat(np.arange(len(self.book_ids)), self.counts)
+
+        if n_rows:
+            cols = np.arange(n_rows) - self.offsets[self.owners]
+            self.segments[self.owners, cols] = np.arange(n_rows)
+
+    # every *_scores method takes an optional array of book positions so a
+    # candidate set from the ANN index can be scored without touching the rest
+
+    def genre_scores(self, user_genres, idx=None):
+        has_genres = _take(self.has_genres, idx)
+
+        user_set = set(user_genres or [])
+        if not user_set:
+            return np.full(len(has_genres), 0.3)
+
+        user_bits = np.zeros(self.genre_bits.shape[1], dtype=np.uint64)
+        for g in user_set:
+            bit = self.genre_bit.get(g)
+            if bit is not None:
+                user_bits[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+        overlap = np.bitwise_count(_take(self.genre_bits, idx) & user_bits).sum(axis=1)
+        scores = overlap / len(user_set)
+
+        return np.where(has_genres, scores, 0.3)
+
+    def grade_scores(self, user_grade, idx=None):
+        avg_grade = _take(self.avg_grade, idx)
+        diff = np.abs(float(user_grade) - avg_grade)
+        scores = np.maximum(0.0, 1 - diff / 6)
+        return np.where(np.isnan(avg_grade), 0.5, scores)
+
+    def sentiment_scores(self, idx=None):
+        return _take(self.avg_sentiment, idx)
+
+    def semantic_scores(self, user_profile, idx=None):
+        # mean of each book's top-3 review similarities (soft max pooling)
+        counts = _take(self.counts, idx)
+        scores = np.zeros(len(counts), dtype=np.float64)
+        if not len(self.vectors):
+            return scores
+
+        query = np.asarray(user_profile, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return scores
+        query = query / norm
+
+        if idx is None:
+            sims = self._buffer("sims", len(self.vectors) + 1, np.float32)
+            np.matmul(self.unit_vectors, query, out=sims[:-1])
+            sims[-1] = -np.inf
+            padded = sims[self.segments]
+        else:
+            # only the candidates' own rows are multiplied
+            segments = self.segments[idx]
+            valid = segments < len(self.vectors)
+            padded = self.unit_vectors[np.where(valid, segments, 0)] @ query
+            padded[~valid] = -np.inf
+
+        width = padded.shape[1]
+        k = min(self.TOP_SIMS, width)
+        top = np.partition(padded, width - k, axis=1)[:, width - k:]
+
+        top = np.where(np.isfinite(top), top, 0.0)
+        taken = np.minimum(counts, self.TOP_SIMS)
+        np.divide(top.sum(axis=1), taken, out=scores, where=taken > 0)
+
+        return scores
+
+    # hybrid_scores / cold_start_scores return a per-thread buffer that the
+    # next call on the same thread overwrites; copy anything you keep
+
+    def hybrid_scores(self, user_profile, user_genres, user_grade, weights, idx=None):
+        n = len(self.book_ids) if idx is None else len(idx)
+        final = self._buffer("final", n)
+
+        np.multiply(self.semantic_scores(user_profile, idx), weights["embedding"], out=final)
+        final += weights["genre"] * self.genre_scores(user_genres, idx)
+        final += weights["grade"] * self.grade_scores(user_grade, idx)
+        final += weights["sentiment"] * self.sentiment_scores(idx)
+        final *= _take(self.decay, idx)
+
+        return final
+
+    def cold_start_scores(self, user_genres, user_grade):
+        final = self._buffer("cold", len(self.book_ids))
+
+        np.multiply(self.genre_scores(user_genres), 0.7, out=final)
+        final += 0.3 * self.grade_scores(user_grade)
+
+        return final
+
+
+def top_k_indices(scores, k):
+    # O(N) argpartition selection, then only the k winners get sorted.
+    # Ties go to the lower index, same as a stable full sort.
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        # argpartition picks arbitrarily among scores tied at the k-th place;
+        # take every index at or above that score and let lexsort decide
+        top = np.flatnonzero(scores >= scores[top].min())
+    else:
+        top = np.arange(len(scores))
+
+    return top[np.lexsort((top, -scores[top]))][:k]
+
+
+def _take(arr, idx):
+    return arr if idx is None else arr[idx]
@@ -1,20 +1,82 @@
-import torch
-from transformers import pipeline
+import hashlib
+import os
+from recommendationModel.kvstore import SQLiteKV
+
+MODEL_NAME = "siebert/sentiment-roberta-large-english"
+DISTILLED_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# all of these emit POSITIVE / NEGATIVE labels
+BACKENDS = {
+    "roberta-large": {"model": MODEL_NAME},
+    "roberta-large-int8": {"model": MODEL_NAME, "runtime": "int8"},
+    "roberta-large-onnx": {"model": MODEL_NAME, "runtime": "onnx"},
+    "distilbert": {"model": DISTILLED_MODEL_NAME},
+}
+
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "roberta-large")
+
+SENTIMENT_CACHE_PATH = os.environ.get(
+    "SENTIMENT_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "cache", "sentiment.sqlite")
+)
+
+def _build_pipeline(backend):
+    from transformers import pipeline
+
+    config = BACKENDS[backend]
+    runtime = config.get("runtime")
+
+    if runtime is None:
+        return pipeline("sentiment-analysis", model=config["model"], device="cpu")
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(config["model"])
+
+    if runtime == "int8":
+        # dynamic quantization of the Linear layers, CPU only
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(config["model"])
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    elif runtime == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise ImportError(
+                "SENTIMENT_BACKEND=roberta-large-onnx needs optimum[onnxruntime]"
+            ) from e
+
+        model = ORTModelForSequenceClassification.from_pretrained(config["model"], export=True)
+
+    else:
+        raise ValueError(f"Unknown sentiment runtime: {runtime}")
+
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device="cpu")
 
 class ReviewSentimentAnalyzer:
-    def __init__(self):
-        self.pipeline = pipeline(
-            "sentiment-analysis",
-            model="siebert/sentiment-roberta-large-english",
-            device="cpu"
-        )
+    def __init__(self, backend=SENTIMENT_BACKEND, cache_path=SENTIMENT_CACHE_PATH, batch_size=16):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown sentiment backend: {backend} (choose from {', '.join(BACKENDS)})")
 
-    def score(self, text: str) -> float:
-        #returns [0, 1]
-        if not text or not text.strip():
-            return 0.5
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cache = SQLiteKV(cache_path, table="sentiment") if cache_path else None
+        self._pipeline = None
+
+    @property
+    def pipeline(self):
+        # the model is only loaded once something actually misses the cache
+        if self._pipeline is None:
+            self._pipeline = _build_pipeline(self.backend)
+        return self._pipeline
 
-        result = self.pipeline(text[:512])[0]
+    def _cache_key(self, text):
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{self.backend}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _to_score(self, result):
         label = result["label"]
         confidence = result["score"]
 
@@ -22,3 +84,47 @@ class ReviewSentimentAnalyzer:
             return confidence
         else:
             return 1 - confidence
+
+    def score(self, text: str) -> float:
+        #returns [0, 1]
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts):
+        # returns one score in [0, 1] per text; blanks score 0.5
+        scores = [0.5] * len(texts)
+
+        keys = {}
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                keys.setdefault(self._cache_key(text), []).append(i)
+
+        cached = self.cache.get_many(keys) if self.cache else {}
+        todo = [k for k in keys if k not in cached]
+
+        if todo:
+            # similar lengths per batch keep padding down
+            todo.sort(key=lambda k: len(texts[keys[k][0]]))
+            results = self.pipeline(
+                [texts[keys[k][0]][:512] for k in todo],
+                batch_size=self.batch_size
+            )
+
+            fresh = {k: self._to_score(r) for k, r in zip(todo, results)}
+            if self.cache:
+                self.cache.set_many(fresh)
+            cached.update(fresh)
+
+        for k, positions in keys.items():
+            for i in positions:
+                scores[i] = cached[k]
+
+        return scores
+
+_analyzer = None
+
+def get_analyzer():
+    # one analyzer (and one model load) per process
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = ReviewSentimentAnalyzer()
+    return _analyzer
@@ -0,0 +1,75 @@
+"""
+Compare sentiment backends against roberta-large on the review CSV.
+
+    cd backend
+    python -m recommendationModel.sentiment_benchmark --backends distilbert roberta-large-int8
+
+Reports load time, throughput, label agreement with the baseline and the
+mean absolute score difference. The sentiment cache is bypassed.
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from recommendationModel.sentiment import BACKENDS, ReviewSentimentAnalyzer
+
+BASELINE = "roberta-large"
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), "bigReviews.csv")
+
+
+def load_texts(csv_path, limit=None):
+    df = pd.read_csv(csv_path)
+    texts = df["Submit your review below (200-400 word count)"].dropna().astype(str).tolist()
+    return texts[:limit] if limit else texts
+
+
+def run_backend(backend, texts, batch_size):
+    analyzer = ReviewSentimentAnalyzer(backend=backend, cache_path=None, batch_size=batch_size)
+
+    start = time.perf_counter()
+    analyzer.pipeline
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = np.array(analyzer.score_batch(texts))
+    run_s = time.perf_counter() - start
+
+    return scores, load_s, run_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--backends", nargs="+", default=[b for b in BACKENDS if b != BASELINE], choices=list(BACKENDS))
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    texts = load_texts(args.csv, args.limit)
+    print(f"{len(texts)} reviews from {args.csv}\n")
+
+    baseline, load_s, run_s = run_backend(BASELINE, texts, args.batch_size)
+
+    print(f"{'backend':<22}{'load s':>8}{'reviews/s':>12}{'agree':>9}{'mean |d|':>10}")
+    print(f"{BASELINE:<22}{load_s:>8.1f}{len(texts) / run_s:>12.1f}{1.0:>9.3f}{0.0:>10.3f}")
+
+    for backend in args.backends:
+        if backend == BASELINE:
+            continue
+
+        try:
+            scores, load_s, run_s = run_backend(backend, texts, args.batch_size)
+        except ImportError as e:
+            print(f"{backend:<22}skipped: {e}")
+            continue
+
+        agree = float(np.mean((scores >= 0.5) == (baseline >= 0.5)))
+        diff = float(np.mean(np.abs(scores - baseline)))
+
+        print(f"{backend:<22}{load_s:>8.1f}{len(texts) / run_s:>12.1f}{agree:>9.3f}{diff:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
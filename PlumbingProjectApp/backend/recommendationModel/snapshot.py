@@ -0,0 +1,54 @@
+"""
+Compact, pickle-free serialization of a HybridRecommender.
+
+A snapshot is a dict of plain NumPy arrays plus a books table of plain
+Python values. encode_snapshot packs it with msgpack (arrays as raw
+bytes + dtype + shape) and compresses the result with zstd.
+"""
+
+import msgpack
+import numpy as np
+import zstandard
+
+SNAPSHOT_FORMAT = 1
+
+
+def _pack_array(arr):
+    arr = np.ascontiguousarray(arr)
+    return {"dtype": arr.dtype.str, "shape": list(arr.shape), "data": arr.tobytes()}
+
+
+def _unpack_array(d):
+    return np.frombuffer(d["data"], dtype=np.dtype(d["dtype"])).reshape(d["shape"])
+
+
+def _default(obj):
+    # numpy scalars that slipped into the books table
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj)}")
+
+
+def encode_snapshot(snapshot, level=3):
+    body = {
+        "format": SNAPSHOT_FORMAT,
+        "book_ids": snapshot["book_ids"],
+        "books": snapshot["books"],
+        "arrays": {k: _pack_array(v) for k, v in snapshot["arrays"].items()}
+    }
+    raw = msgpack.packb(body, default=_default, use_bin_type=True)
+    return zstandard.ZstdCompressor(level=level).compress(raw)
+
+
+def decode_snapshot(payload):
+    raw = zstandard.ZstdDecompressor().decompress(payload)
+    body = msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+    if body.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {body.get('format')}")
+
+    return {
+        "book_ids": body["book_ids"],
+        "books": body["books"],
+        "arrays": {k: _unpack_array(v) for k, v in body["arrays"].items()}
+    }
@@ -20,6 +20,7 @@ class Review(Model):
     # Book Information
     book_title = TextField()
     author = TextField()
+    book_id = TextField()  # make_book_id(book_title, author), for per-book queries
     recommended_audience_grade = ListField()
     
     # Review Content
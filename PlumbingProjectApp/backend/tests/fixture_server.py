@@ -0,0 +1,72 @@
+"""
+A local HTTP server that replays recorded responses.
+
+A fixture is a JSON file in tests/fixtures/<dir> holding a list of
+exchanges: the request's query params, and the status, content type and
+body to answer with. The body is inline JSON, or read from `body_file`
+next to the fixture. Every request is recorded; anything not in the
+fixture is answered with 404 and kept in `unmatched`.
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FixtureServer:
+    def __init__(self, name, path="/"):
+        fixture_path = os.path.join(FIXTURES, name)
+        with open(fixture_path) as f:
+            self.exchanges = json.load(f)["exchanges"]
+
+        for exchange in self.exchanges:
+            if "body_file" in exchange:
+                with open(os.path.join(os.path.dirname(fixture_path), exchange["body_file"])) as f:
+                    exchange["body"] = f.read()
+
+        self.requests = []
+        self.unmatched = []
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                params = dict(parse_qsl(urlparse(self.path).query))
+                fixture.requests.append(params)
+
+                for exchange in fixture.exchanges:
+                    if exchange["params"] == params:
+                        break
+                else:
+                    fixture.unmatched.append(params)
+                    exchange = {"status": 404, "body": {"error": "no recorded response"}}
+
+                body = exchange["body"]
+                content_type = exchange.get("content_type", "application/json")
+                payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+
+                self.send_response(exchange["status"])
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, **params):
+        return sum(1 for r in self.requests if all(r.get(k) == v for k, v in params.items()))
@@ -0,0 +1,88 @@
+"""
+HttpAvailabilityChecker against recorded catalog search responses.
+
+    cd backend
+    python -m unittest tests.test_availability
+
+tests/fixtures/library/search.json maps each search query to a recorded
+page: result cards, a "no results" page, the JSON search response and the
+JavaScript-only shell that needs the Selenium fallback.
+"""
+
+import unittest
+import requests
+from recommendationModel.housedBooks.availability import HttpAvailabilityChecker
+from tests.fixture_server import FixtureServer
+
+
+class FakeBrowserChecker:
+    # stands in for LibraryAvailabilityChecker, which needs Chrome
+    instances = []
+
+    def __init__(self):
+        self.looked_up = []
+        self.closed = False
+        FakeBrowserChecker.instances.append(self)
+
+    def lookup(self, title):
+        self.looked_up.append(title)
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class HttpAvailabilityCheckerTest(unittest.TestCase):
+    def setUp(self):
+        FakeBrowserChecker.instances = []
+        self.server = FixtureServer("library/search.json", "/search").__enter__()
+        self.checker = HttpAvailabilityChecker(search_base=self.server.url, fallback=FakeBrowserChecker)
+
+    def tearDown(self):
+        self.checker.close()
+        self.server.__exit__(None, None, None)
+        self.assertEqual(self.server.unmatched, [])
+
+    def test_cards_page(self):
+        self.assertEqual(self.checker.fetch_titles("The Hunger Games"), ["The Hunger Games", "Catching Fire"])
+        self.assertTrue(self.checker.lookup("The Hunger Games"))
+        self.assertFalse(self.checker.lookup("Mockingjay"))
+        self.assertEqual(FakeBrowserChecker.instances, [])
+
+    def test_no_results_page(self):
+        self.assertEqual(self.checker.fetch_titles("Nowhere Book"), [])
+        self.assertFalse(self.checker.lookup("Nowhere Book"))
+        self.assertEqual(FakeBrowserChecker.instances, [])
+
+    def test_json_response(self):
+        self.assertEqual(self.checker.fetch_titles("Dune"), ["Dune"])
+        self.assertTrue(self.checker.lookup("Dune"))
+
+    def test_js_shell_falls_back_to_browser(self):
+        self.assertIsNone(self.checker.fetch_titles("Emma"))
+        self.assertTrue(self.checker.lookup("Emma"))
+        self.assertTrue(self.checker.lookup("Emma"))
+
+        # one browser session, started on first use and closed with the checker
+        [browser] = FakeBrowserChecker.instances
+        self.assertEqual(browser.looked_up, ["Emma", "Emma"])
+        self.checker.close()
+        self.assertTrue(browser.closed)
+
+    def test_js_shell_without_fallback_raises(self):
+        checker = HttpAvailabilityChecker(search_base=self.server.url)
+        with self.assertRaises(RuntimeError):
+            checker.lookup("Emma")
+        checker.close()
+
+    def test_server_error_is_raised_once(self):
+        # the daily job retries (taking a rate-limit token each time); the
+        # session itself must not
+        with self.assertRaises(requests.HTTPError):
+            self.checker.lookup("Middlemarch")
+        self.assertEqual(self.server.count(query="Middlemarch"), 1)
+        self.assertFalse(self.checker.availability("Middlemarch"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+resolve_genres_batch against recorded MediaWiki responses.
+
+    cd backend
+    python -m unittest tests.test_genre_batch
+
+Each fixture in tests/fixtures/wikipedia is a list of recorded exchanges
+(request params -> status and JSON body), replayed by FixtureServer;
+anything not in the fixture fails the test.
+"""
+
+import unittest
+from recommendationModel.genreCategorization import resolve_genres_batch
+from tests.fixture_server import FixtureServer
+
+
+class ResolveGenresBatchTest(unittest.TestCase):
+    def resolve(self, fixture, books):
+        with FixtureServer(f"wikipedia/{fixture}", "/w/api.php") as server:
+            results = resolve_genres_batch(books, api_url=server.url)
+
+        self.assertEqual(server.unmatched, [])
+        return results, server
+
+    def test_batches_titles(self):
+        books = [(f"Novel {i:02d}", None) for i in range(1, 61)]
+        results, server = self.resolve("batching.json", books)
+
+        self.assertEqual(results, {book: ["fantasy"] for book in books})
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(server.count(list="search"), 0)
+
+    def test_follows_continuation(self):
+        results, server = self.resolve("continuation.json", [("Emma", None), ("Middlemarch", None)])
+
+        self.assertEqual(results, {("Emma", None): ["romance"], ("Middlemarch", None): ["literary-fiction"]})
+        self.assertEqual(server.count(rvcontinue="19827|1187310044"), 1)
+
+    def test_follows_normalization_and_redirects(self):
+        results, _ = self.resolve("redirects.json", [("the hobbit", None)])
+
+        self.assertEqual(results, {("the hobbit", None): ["fantasy"]})
+
+    def test_non_book_page_falls_back_to_search(self):
+        results, server = self.resolve("non_book.json", [("Thriller", "Jane Doe")])
+
+        self.assertEqual(results, {("Thriller", "Jane Doe"): ["horror"]})
+        self.assertEqual(server.count(srsearch="Thriller Jane Doe"), 1)
+
+    def test_failed_lookup_is_left_out(self):
+        results, _ = self.resolve("rate_limited.json", [("Nowhere Book", None), ("Unknown Book", None)])
+
+        # the 429 is not "no genres"; only the empty search is
+        self.assertEqual(results, {("Unknown Book", None): []})
+
+
+if __name__ == "__main__":
+    unittest.main()